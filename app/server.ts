@@ -57,6 +57,9 @@ const upload = multer({
   }
 });
 
+// Job queue service (src/job_queue.py) that runs the queued CVs
+const JOB_SERVICE_URL = process.env.JOB_SERVICE_URL || 'http://127.0.0.1:8766';
+
 // Endpoint to handle CV uploads
 app.post('/api/upload-cv', upload.single('file'), (req, res) => {
   if (!req.file) {
@@ -66,16 +69,15 @@ app.post('/api/upload-cv', upload.single('file'), (req, res) => {
   const filePath = path.join(downloadsDir, req.file.filename);
   const projectRoot = path.join(__dirname, '..');
 
-  // Spawn the Python script without waiting for it to complete
+  // auto_apply.py only enqueues the CV and prints the job as one JSON line, so wait for it
   const pythonProcess = spawn('python3', [path.join(projectRoot, 'auto_apply.py'), filePath], {
     cwd: projectRoot, // Set working directory to project root
-    detached: true, // Allow the process to run independently
     stdio: 'pipe' // Capture output
   });
 
-  // Log output for debugging
+  let stdout = '';
   pythonProcess.stdout?.on('data', (data) => {
-    console.log(`[auto_apply.py] ${data}`);
+    stdout += data;
   });
 
   pythonProcess.stderr?.on('data', (data) => {
@@ -84,19 +86,46 @@ app.post('/api/upload-cv', upload.single('file'), (req, res) => {
 
   pythonProcess.on('error', (err) => {
     console.error(`[auto_apply.py] Failed to spawn: ${err}`);
+    res.status(500).json({ error: 'Could not queue the CV' });
   });
 
-  // Unref the process so Node doesn't wait for it
-  pythonProcess.unref();
+  pythonProcess.on('close', (code) => {
+    if (res.headersSent) {
+      return;
+    }
+    const lines = stdout.trim().split('\n');
+    let body: any = {};
+    try {
+      body = JSON.parse(lines[lines.length - 1]);
+    } catch {
+      console.error(`[auto_apply.py] Unexpected output: ${stdout}`);
+    }
 
-  // Return success immediately without waiting for the script
-  res.json({
-    success: true,
-    message: 'File uploaded and script triggered',
-    filePath: filePath
+    if (code === 0 && body.job_id) {
+      return res.status(202).json({
+        success: true,
+        message: 'CV queued',
+        jobId: body.job_id,
+        statusUrl: `/api/jobs/${body.job_id}`,
+        filePath: filePath
+      });
+    }
+    // exit code 2: the queue is full
+    res.status(code === 2 ? 429 : 400).json({ success: false, error: body.error || 'Could not queue the CV' });
   });
 });
 
+// Status of a queued CV, proxied from the job queue service
+app.get('/api/jobs/:id', async (req, res) => {
+  try {
+    const response = await fetch(`${JOB_SERVICE_URL}/jobs/${encodeURIComponent(req.params.id)}`);
+    res.status(response.status).json(await response.json());
+  } catch (err) {
+    console.error(`[job queue] Status request failed: ${err}`);
+    res.status(503).json({ error: 'Job queue service is not running' });
+  }
+});
+
 // Health check endpoint
 app.get('/api/health', (req, res) => {
   res.json({ status: 'ok' });
@@ -1,11 +1,48 @@
+"""
+Entry point spawned by app/server.ts for every uploaded CV.
+
+Extracts the CV's text (cached by file hash, see src/cv_ingest.py) so unreadable
+files are rejected straight away, enqueues the CV on the job queue (see
+src/job_queue.py) and prints the job as one JSON line; the job queue service
+does the actual work. Exits with status 2 if the queue is full.
+"""
+
+import json
+import os
 import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from cv_ingest import CVIngestError, read_cv
+from job_queue import JobQueue, QueueFullError
+
+
+def log(message: str):
+    timestamp = datetime.now().isoformat()
+    with open("test_log.log", "a") as f:
+        f.write(f"[{timestamp}] {message}\n")
+
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("usage: python3 auto_apply.py <pdf file>")
         sys.exit(1)
-    print(f"analysing cv '{sys.argv[1]}'")
-    timestamp = datetime.now().isoformat()
-    with open("test_log.log", "w") as f:
-        f.write(f"[{timestamp}] hello world {sys.argv[1]}")
+    cv_file = sys.argv[1]
+    log(f"received {cv_file}")
+
+    try:
+        read_cv(cv_file)
+    except (CVIngestError, OSError) as e:
+        log(f"could not read {cv_file}: {e}")
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+
+    try:
+        job_id = JobQueue().enqueue(cv_file)
+    except QueueFullError as e:
+        log(str(e))
+        print(json.dumps({"error": str(e)}))
+        sys.exit(2)
+
+    log(f"queued {cv_file} as job {job_id}")
+    print(json.dumps({"job_id": job_id, "status": "queued"}))
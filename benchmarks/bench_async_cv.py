@@ -0,0 +1,101 @@
+"""
+CV tailoring throughput of one create_optimised_cv call after another against the
+create_optimised_cvs batch, which keeps several GPT-5 requests in flight, both against
+the local OpenAI stub.
+
+Usage (from the project root):
+    python benchmarks/bench_async_cv.py --n 12 --in_flight 4 --openai_latency_s 5
+    python benchmarks/bench_async_cv.py --rate_limit_every 5 --server_error_every 7
+
+Jobs are the recorded Reed listings in fixtures/reed/session.json, repeated to reach n.
+--rate_limit_every / --server_error_every make the stub answer every k-th request with
+a 429 / 500 so the retry path is exercised. Requires pdflatex.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# the LLM cache is read from the environment at import; keep the real one untouched
+WORKDIR = Path(tempfile.mkdtemp(prefix="bench-async-cv-"))
+os.environ["LLM_CACHE_PATH"] = str(WORKDIR / "llm_cache.sqlite")
+os.environ.setdefault("LATEX_FORMAT_DIR", str(ROOT / ".cache" / "latex_formats"))
+os.environ["OPENAI_API_KEY"] = "stub"
+
+import create_optimised_cv as cv
+import llm_cache
+from fakes import REED_SESSION
+from models import JobDetails
+from stub_servers import OpenAIStubHandler, serve
+from utils import make_filename
+
+
+def load_jobs(n: int) -> list[JobDetails]:
+    listings = json.loads(REED_SESSION.read_text())["listings"]
+    jobs = []
+    for i in range(n):
+        job = JobDetails.model_validate(listings[i % len(listings)])
+        jobs.append(job.model_copy(update={"title": f"{job.title} {i}"}))
+    return jobs
+
+
+def main(n: int = 12, in_flight: int = 4, requests_per_minute: float = 600, openai_latency_s: float = 5.0,
+         rate_limit_every: int = 0, server_error_every: int = 0, retry_base_s: float = 0.5,
+         structured: bool = False, cv_file: str = str(ROOT / "src" / "resume.txt")):
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex not found; install TeX Live (see README) to run this benchmark")
+
+    cv_text = Path(cv_file).read_text()
+    jobs = load_jobs(n)
+    llm_cache.set_enabled(False)
+    cv.MAX_IN_FLIGHT = in_flight
+    cv.REQUESTS_PER_MINUTE = requests_per_minute
+    cv.RETRY_BASE_S = retry_base_s
+
+    OpenAIStubHandler.latency_s = openai_latency_s
+    OpenAIStubHandler.rate_limit_every = rate_limit_every
+    OpenAIStubHandler.server_error_every = server_error_every
+    with serve(OpenAIStubHandler) as base_url:
+        os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+        # the sync path only has the SDK's default retries, so it runs without injected errors
+        OpenAIStubHandler.rate_limit_every = OpenAIStubHandler.server_error_every = 0
+        start = time.perf_counter()
+        for job in jobs:
+            cv.create_optimised_cv(cv_text, job.description, str(WORKDIR / "sequential"),
+                                   make_filename(job.title, job.company), structured)
+        sequential_s = time.perf_counter() - start
+
+        OpenAIStubHandler.rate_limit_every = rate_limit_every
+        OpenAIStubHandler.server_error_every = server_error_every
+        OpenAIStubHandler.request_count = 0
+        start = time.perf_counter()
+        results = cv.create_optimised_cvs(cv_text, jobs, str(WORKDIR / "batch"), structured)
+        batch_s = time.perf_counter() - start
+        requests = OpenAIStubHandler.request_count
+
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    print(f"\n{n} CVs, {in_flight} in flight, {requests_per_minute:g} requests/min, "
+          f"stub latency {openai_latency_s}s")
+    print(f"{'mode':<12}{'seconds':>10}{'CVs/min':>10}")
+    print(f"{'sequential':<12}{sequential_s:>10.1f}{n / sequential_s * 60:>10.1f}")
+    print(f"{'batch':<12}{batch_s:>10.1f}{n / batch_s * 60:>10.1f}")
+    print(f"speed-up: {sequential_s / batch_s:.2f}x; batch sent {requests} requests "
+          f"({requests - n} retried), {len(failed)} failed")
+    for error in failed:
+        print(f"  {type(error).__name__}: {error}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
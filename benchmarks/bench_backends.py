@@ -0,0 +1,107 @@
+"""
+Compare local-model backends (bf16 transformers vs GGUF llama.cpp): load time,
+tokens/second and peak resident memory for title extraction and resume tailoring.
+
+Each backend runs in its own subprocess, so peak RSS is measured per backend and
+one model's weights never inflate the other's numbers.
+
+Usage (from the project root):
+    python benchmarks/bench_backends.py --runs 3
+    LLM_GGUF_PATH=models/llama-3.1-8b-q4_k_m.gguf LLM_THREADS=8 python benchmarks/bench_backends.py
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+SAMPLE_JOB = {
+    "title": "Machine Learning Engineer",
+    "company": "Acme Analytics",
+    "location": "London",
+    "salary": None,
+    "link": "https://boards.greenhouse.io/acmeanalytics/jobs/4000001",
+    "description": "Build and ship ML models in Python; experience with PyTorch, SQL and cloud deployment.",
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _count_tokens(text: str) -> int:
+    import model_provider
+
+    if model_provider.BACKEND == "llamacpp":
+        return len(model_provider.get_llama().tokenize(text.encode("utf-8"), add_bos=False))
+    return len(model_provider.get_pipeline().tokenizer(text, add_special_tokens=False).input_ids)
+
+
+def child(backend: str, runs: int, cv_file: str):
+    """Benchmark one backend in this process and print a JSON result line."""
+    import llm
+    import llm_cache
+    import model_provider
+
+    model_provider.set_backend(backend)
+    llm_cache.set_enabled(False)
+    cv_text = Path(cv_file).read_text()
+
+    load = model_provider.warmup()
+    result = {"backend": backend, "model": model_provider.model_name(), "load_s": load.get("load_s")}
+
+    tasks = {
+        "titles": lambda: llm._chat(llm._title_messages(cv_text), llm.TITLE_GENERATION),
+        "resume": lambda: llm.generate_tailored_resume(cv_text, SAMPLE_JOB),
+    }
+    for name, task in tasks.items():
+        task()  # warm-up: kernel set-up and, for resumes, the prompt prefix
+        tokens = 0
+        start = time.perf_counter()
+        for _ in range(runs):
+            tokens += _count_tokens(task())
+        seconds = time.perf_counter() - start
+        result[f"{name}_tok_s"] = tokens / seconds
+        result[f"{name}_s"] = seconds / runs
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    print(json.dumps(result))
+
+
+def main(backends: str = "transformers,llamacpp", runs: int = 3,
+         cv_file: str = str(ROOT / "src" / "resume.txt"), child_backend: str | None = None):
+    if child_backend:
+        return child(child_backend, runs, cv_file)
+
+    results = []
+    for backend in backends.split(","):
+        print(f"running {backend} ...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child_backend", backend, "--runs", str(runs), "--cv_file", cv_file],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend} failed:\n{proc.stderr[-2000:]}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    print(f"{'backend':<14}{'load s':>8}{'titles tok/s':>14}{'resume tok/s':>14}{'resume s':>10}{'peak RSS MB':>13}")
+    for r in results:
+        print(f"{r['backend']:<14}{r['load_s'] or 0:>8.1f}{r['titles_tok_s']:>14.1f}{r['resume_tok_s']:>14.1f}"
+              f"{r['resume_s']:>10.1f}{r['peak_rss_mb']:>13.0f}")
+    for r in results:
+        print(f"{r['backend']}: {r['model']}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,116 @@
+"""
+Tokens/second of the local model with and without JSON-schema constrained decoding,
+for job-title extraction (list[str]) and listing extraction (JobDetails).
+
+Usage (from the project root):
+    python benchmarks/bench_constrained_decoding.py --runs 5
+
+Listings come from the recorded Greenhouse fixtures. The LLM cache is disabled so
+every run generates.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+import llm
+import llm_cache
+import model_provider
+from greenhouse_crawler import _html_to_text
+from models import JobDetails
+from pydantic import TypeAdapter
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures" / "greenhouse"
+
+JOB_DETAILS_SYSTEM = """
+You read the text of a job listing and return ONLY a JSON object with the fields
+title, company, location, salary, description and link.
+Use null for location, salary or description when the listing does not state them.
+"""
+JOB_DETAILS_GENERATION = {"max_new_tokens": 768, "do_sample": False}
+
+
+def load_listings(n: int) -> list[tuple[str, str]]:
+    listings = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.json")):
+        for job in json.loads(fixture.read_text())["jobs"]:
+            listings.append((f"{job['title']}\n\n{_html_to_text(job.get('content', ''))}", job["absolute_url"]))
+    return listings[:n]
+
+
+def run(name: str, calls: list, validate) -> dict:
+    tokenizer = model_provider.get_pipeline().tokenizer
+    tokens, valid = 0, 0
+    start = time.perf_counter()
+    for call in calls:
+        text = call()
+        tokens += len(tokenizer(text, add_special_tokens=False).input_ids)
+        valid += validate(text)
+    seconds = time.perf_counter() - start
+    return {"name": name, "seconds": seconds, "tokens": tokens, "valid": valid, "calls": len(calls)}
+
+
+def _validates(adapter):
+    def check(text: str) -> bool:
+        try:
+            adapter.validate_json(text.strip())
+            return True
+        except ValueError:
+            return False
+    return check
+
+
+def _generate(messages, model, generation: dict):
+    pipe = model_provider.get_pipeline()
+
+    def call():
+        out = pipe(messages, return_full_text=False, **llm._constraint_kwargs(pipe, model), **generation)
+        return out[0]["generated_text"]
+    return call
+
+
+def main(runs: int = 5, cv_file: str = str(ROOT / "src" / "resume.txt")):
+    llm_cache.set_enabled(False)
+    print("load:", model_provider.warmup())
+    cv_text = Path(cv_file).read_text()
+    listings = load_listings(runs)
+
+    title_calls = [_generate(llm._title_messages(cv_text), list[str], llm.TITLE_GENERATION)] * runs
+    detail_calls = [
+        _generate(
+            [{"role": "system", "content": JOB_DETAILS_SYSTEM},
+             {"role": "user", "content": f"Link: {link}\n\n{text}"}],
+            JobDetails, JOB_DETAILS_GENERATION,
+        )
+        for text, link in listings
+    ]
+    title_check = _validates(TypeAdapter(list[str]))
+    detail_check = _validates(TypeAdapter(JobDetails))
+
+    title_calls[0]()  # first call pays one-off kernel set-up
+    results = []
+    for constrained in (False, True):
+        llm.set_constrained_decoding(constrained)
+        mode = "constrained" if constrained else "free"
+        results.append(run(f"titles/{mode}", title_calls, title_check))
+        results.append(run(f"details/{mode}", detail_calls, detail_check))
+
+    print(f"{'run':<22}{'seconds':>10}{'tokens':>10}{'tok/s':>10}{'valid':>10}")
+    for r in results:
+        print(f"{r['name']:<22}{r['seconds']:>10.2f}{r['tokens']:>10}{r['tokens'] / r['seconds']:>10.1f}"
+              f"{r['valid']:>6}/{r['calls']}")
+    for kind in ("titles", "details"):
+        free, constrained = (next(r for r in results if r["name"] == f"{kind}/{m}") for m in ("free", "constrained"))
+        overhead = (free["tokens"] / free["seconds"]) / (constrained["tokens"] / constrained["seconds"]) - 1
+        print(f"{kind}: masking overhead {overhead * 100:+.1f}% per token")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
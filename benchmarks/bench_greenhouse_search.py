@@ -0,0 +1,53 @@
+"""
+Greenhouse search against a local Google CSE stub: one request at a time, one page
+per query variant, versus the pooled, concurrent search_jobs_async.
+
+Usage (from the project root):
+    python benchmarks/bench_greenhouse_search.py --pages 3 --concurrency 4
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from stub_servers import CSEStubHandler, serve
+import tools
+
+DESCRIPTION = "software engineer intern or graduate in London, python and data science, remote ok"
+
+
+def main(pages: int = 3, concurrency: int = 4, latency_s: float = 0.05):
+    os.environ.setdefault("GOOGLE_CSE_API_KEY", "stub-key")
+    os.environ.setdefault("GOOGLE_CSE_ENGINE_ID", "stub-engine")
+    CSEStubHandler.latency_s = latency_s
+
+    with serve(CSEStubHandler) as base_url:
+        endpoint = f"{base_url}/customsearch/v1"
+        queries = tools._build_query_variants(tools._extract_keywords(DESCRIPTION))
+
+        start = time.perf_counter()
+        sequential = asyncio.run(tools.search_jobs_async(DESCRIPTION, pages=1, concurrency=1, endpoint=endpoint))
+        sequential_s = time.perf_counter() - start
+
+        CSEStubHandler.request_count = 0
+        start = time.perf_counter()
+        concurrent = asyncio.run(
+            tools.search_jobs_async(DESCRIPTION, pages=pages, concurrency=concurrency, endpoint=endpoint)
+        )
+        concurrent_s = time.perf_counter() - start
+
+    print(f"{len(queries)} query variants")
+    print(f"sequential, 1 page each:        {sequential_s:6.2f}s  {len(sequential)} unique URLs")
+    print(f"async, {pages} pages, {concurrency} in flight: {concurrent_s:6.2f}s  {len(concurrent)} unique URLs "
+          f"({CSEStubHandler.request_count} requests incl. 429 retries)")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,64 @@
+"""
+Throughput of keyword extraction: the compiled KeywordMatcher in tools.py against
+the previous per-term substring scan.
+
+Usage (from the project root):
+    python benchmarks/bench_keywords.py --n 5000
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools import DEFAULT_VOCABULARY, extract_keywords_batch
+
+FILLER = (
+    "we are looking for a motivated person to join our growing team and help build "
+    "good products with html css and modern tooling across the business"
+).split()
+
+
+def substring_scan(description: str) -> dict:
+    """The original _extract_keywords matching: a linear `in` test per term."""
+    text = description.lower()
+    return {
+        category: [term for term in terms if term in text]
+        for category, terms in DEFAULT_VOCABULARY.items()
+    }
+
+
+def make_descriptions(n: int, words: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary = [term for terms in DEFAULT_VOCABULARY.values() for term in terms]
+    return [
+        " ".join(rng.choice(vocabulary) if rng.random() < 0.1 else rng.choice(FILLER) for _ in range(words))
+        for _ in range(n)
+    ]
+
+
+def main(n: int = 5000, words: int = 300, seed: int = 0):
+    descriptions = make_descriptions(n, words, seed)
+
+    start = time.perf_counter()
+    for description in descriptions:
+        substring_scan(description)
+    scan_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extract_keywords_batch(descriptions)
+    compiled_s = time.perf_counter() - start
+
+    print(f"{n} descriptions x {words} words")
+    print(f"{'matcher':<16}{'seconds':>10}{'desc/s':>12}")
+    print(f"{'substring scan':<16}{scan_s:>10.3f}{n / scan_s:>12.0f}")
+    print(f"{'compiled regex':<16}{compiled_s:>10.3f}{n / compiled_s:>12.0f}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,128 @@
+"""
+Offline end-to-end benchmark of the apply pipeline with every external service replaced by fixtures.
+
+Job titles come from extract_job_titles on the fixture CV (a FakePipeline replays the
+local model's recorded reply), each title runs through the Reed flow against
+FakeNovaAct (recorded act responses and latencies) and every listing is tailored by
+create_optimised_cv against the local OpenAI stub and compiled with the real pdflatex.
+Reports jobs/minute, p50/p95 per stage (from tracing) and peak RSS.
+
+Usage (from the project root):
+    python benchmarks/bench_pipeline.py --titles 2 --jobs 3
+    python benchmarks/bench_pipeline.py --mode pipeline --workers 2
+    python benchmarks/bench_pipeline.py --act_scale 0 --openai_latency_s 0   # overhead only
+
+--mode picks the flow: sequential (process_jobs_sequential per title) or parallel,
+pipeline and bulk (process_titles_parallel with that mode). --act_scale and
+--model_scale scale the recorded browser and local-model latencies;
+--openai_latency_s / --openai_tokens_per_s set the stub's. Requires pdflatex.
+"""
+
+import functools
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# caches and the seen index are read from the environment at import; keep the real ones untouched
+WORKDIR = Path(tempfile.mkdtemp(prefix="bench-pipeline-"))
+os.environ["LLM_CACHE_PATH"] = str(WORKDIR / "llm_cache.sqlite")
+os.environ["SEEN_INDEX_PATH"] = str(WORKDIR / "seen_listings.sqlite")
+os.environ.setdefault("LATEX_FORMAT_DIR", str(ROOT / ".cache" / "latex_formats"))
+os.environ["OPENAI_API_KEY"] = "stub"
+
+import apply_agent
+import llm_cache
+import model_provider
+import tracing
+from fakes import FakeNovaAct, FakePipeline
+from llm import extract_job_titles
+from seen_index import get_index
+from stub_servers import OpenAIStubHandler, serve
+
+MODES = ("sequential", "parallel", "pipeline", "bulk")
+
+
+def peak_rss_mb() -> tuple[float, float]:
+    """Peak RSS of this process and of its largest finished child (pdflatex), in MB."""
+    to_mb = 1 / 1024  # ru_maxrss is in KB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * to_mb,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * to_mb)
+
+
+def run(mode: str, titles: list[str], cv_text: str, jobs: int, workers: int) -> int:
+    if mode == "sequential":
+        return sum(
+            apply_agent.process_jobs_sequential(title, cv_text, headless=True, limit=jobs) for title in titles
+        )
+    results = apply_agent.process_titles_parallel(
+        titles, cv_text, workers=workers, headless=True, limit=jobs,
+        pipeline=mode == "pipeline", bulk=mode == "bulk",
+    )
+    return sum(result["processed"] for result in results.values())
+
+
+def main(mode: str = "sequential", titles: int = 2, jobs: int = 3, workers: int = 1,
+         cv_file: str = str(ROOT / "src" / "resume.txt"), act_scale: float = 1.0, model_scale: float = 1.0,
+         openai_latency_s: float = 2.0, openai_tokens_per_s: float = 0.0, structured: bool = False,
+         cache: bool = False, keep: bool = False):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex not found; install TeX Live (see README) to run this benchmark")
+
+    cv_text = Path(cv_file).read_text()
+    os.chdir(WORKDIR)  # outputs/ and traces land in the scratch directory
+
+    apply_agent.NovaAct = functools.partial(FakeNovaAct, latency_scale=act_scale)
+    model_provider.set_backend("transformers")
+    pipe = FakePipeline(latency_scale=model_scale)
+    model_provider._pipelines[model_provider.MODEL_ID] = pipe
+    llm_cache.set_enabled(cache)
+    # every title searches the same recorded listings, so don't skip the ones already applied to
+    get_index().skip_processed = False
+    if structured:
+        from create_optimised_cv import set_structured_output
+        set_structured_output(True)
+    trace_path = tracing.setup("jsonl", path=str(WORKDIR / "trace.jsonl"))
+
+    OpenAIStubHandler.latency_s = openai_latency_s
+    OpenAIStubHandler.output_tokens_per_s = openai_tokens_per_s
+    with serve(OpenAIStubHandler) as base_url:
+        os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+        start = time.perf_counter()
+        target_titles = extract_job_titles(cv_text)[:titles]
+        print("Target roles:", target_titles)
+        processed = run(mode, target_titles, cv_text, jobs, workers)
+        elapsed = time.perf_counter() - start
+
+    tracing.shutdown()
+    rss, child_rss = peak_rss_mb()
+    print(f"\nmode={mode} workers={workers} titles={len(target_titles)} jobs/title={jobs} "
+          f"act_scale={act_scale} openai_latency_s={openai_latency_s}")
+    print(f"{processed} jobs in {elapsed:.1f}s: {processed / elapsed * 60:.2f} jobs/min")
+    print(f"peak RSS: {rss:.0f} MB (largest child process {child_rss:.0f} MB)")
+    print(f"OpenAI stub requests: {OpenAIStubHandler.request_count}, local model calls: {pipe.calls}, "
+          f"browser actions: {sum(FakeNovaAct.act_counts.values())}")
+    print()
+    print(tracing.summary_table())
+
+    if keep:
+        print(f"\nOutputs and trace kept in {WORKDIR} ({trace_path})")
+    else:
+        os.chdir(ROOT)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
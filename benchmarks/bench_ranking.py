@@ -0,0 +1,73 @@
+"""
+Cost of ranking listings against a CV with local embeddings, and how much
+downstream tailoring work the top-k cut avoids.
+
+Usage (from the project root):
+    python benchmarks/bench_ranking.py --n 500 --top_k 6
+
+Listings are the recorded Greenhouse fixtures, repeated with varied titles to
+reach n. --tailor_s is the per-listing cost of the GPT-5 + pdflatex step it is
+compared against (measure it with a real run; the default is a rough figure).
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+import ranking
+from greenhouse_crawler import _html_to_text
+from models import JobDetails
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures" / "greenhouse"
+SENIORITY = ["", "Junior ", "Senior ", "Lead ", "Graduate "]
+
+
+def load_listings(n: int) -> list[JobDetails]:
+    base = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.json")):
+        for job in json.loads(fixture.read_text())["jobs"]:
+            base.append((job["title"], fixture.stem, _html_to_text(job.get("content", "")), job["absolute_url"]))
+    listings = []
+    for i in range(n):
+        title, company, description, link = base[i % len(base)]
+        listings.append(JobDetails(
+            title=SENIORITY[i // len(base) % len(SENIORITY)] + title, company=company,
+            location=None, salary=None, description=description, link=f"{link}?v={i}",
+        ))
+    return listings
+
+
+def main(n: int = 500, top_k: int = 6, tailor_s: float = 45.0,
+         cv_file: str = str(ROOT / "src" / "resume.txt")):
+    cv_text = Path(cv_file).read_text()
+    listings = load_listings(n)
+
+    start = time.perf_counter()
+    ranking.cv_embedding(cv_text)
+    cv_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ranking.cv_embedding(cv_text)
+    cached_cv_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ranked = ranking.rank_listings(cv_text, listings, top_k=top_k)
+    rank_s = time.perf_counter() - start
+
+    print(f"CV embedding: {cv_s:.2f}s first (incl. model load), {cached_cv_s * 1000:.2f}ms cached")
+    print(f"ranked {n} listings in {rank_s:.2f}s ({n / rank_s:.0f} listings/s)")
+    for listing, score in ranked:
+        print(f"  {score:.3f}  {listing.title} @ {listing.company}")
+    print(f"tailoring all {n}: ~{n * tailor_s / 60:.0f} min; top {top_k} after ranking: "
+          f"~{(top_k * tailor_s + rank_s) / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
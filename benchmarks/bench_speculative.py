@@ -0,0 +1,114 @@
+"""
+Greedy resume generation with and without a draft model (assisted generation):
+draft-token acceptance rate, end-to-end speed-up and whether outputs match.
+
+Usage (from the project root):
+    python benchmarks/bench_speculative.py --jobs 4
+    LLM_DRAFT_MODEL_ID=meta-llama/Llama-3.2-1B-Instruct python benchmarks/bench_speculative.py
+
+Acceptance is counted with forward hooks: every forward pass of the main model
+during assisted decoding verifies one batch of draft tokens and emits the accepted
+ones plus one token of its own, so accepted = new tokens - main forward passes,
+out of one proposed token per draft forward pass.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+import llm
+import model_provider
+from greenhouse_crawler import _html_to_text
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures" / "greenhouse"
+
+
+def load_jobs(n: int) -> list[dict]:
+    jobs = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.json")):
+        for job in json.loads(fixture.read_text())["jobs"]:
+            jobs.append({
+                "title": job["title"],
+                "company": fixture.stem,
+                "location": (job.get("location") or {}).get("name"),
+                "salary": None,
+                "link": job["absolute_url"],
+                "description": _html_to_text(job.get("content", "")),
+            })
+    return jobs[:n]
+
+
+class ForwardCounter:
+    def __init__(self, model):
+        self.calls = 0
+        self._handle = model.register_forward_hook(self._hook)
+
+    def _hook(self, module, args, output):
+        self.calls += 1
+
+    def remove(self):
+        self._handle.remove()
+
+
+def generate(messages: list[dict], assistant=None) -> tuple[str, int, float]:
+    pipe = model_provider.get_pipeline()
+    generation = dict(llm.RESUME_GENERATION)
+    if assistant is not None:
+        generation["assistant_model"] = assistant
+    start = time.perf_counter()
+    out = pipe(messages, return_full_text=False, **generation)
+    seconds = time.perf_counter() - start
+    text = out[0]["generated_text"]
+    return text, len(pipe.tokenizer(text, add_special_tokens=False).input_ids), seconds
+
+
+def main(jobs: int = 4, cv_file: str = str(ROOT / "src" / "resume.txt")):
+    cv_text = Path(cv_file).read_text()
+    pipe = model_provider.get_pipeline()
+    draft = model_provider.get_draft_model()
+    print("main:", model_provider.load_stats(model_provider.MODEL_ID))
+    print("draft:", model_provider.load_stats(model_provider.DRAFT_MODEL_ID))
+
+    conversations = [llm._resume_messages(cv_text, job)[0] for job in load_jobs(jobs)]
+    generate(conversations[0])  # first call pays one-off kernel set-up
+    generate(conversations[0], draft)
+
+    totals = {"base_s": 0.0, "assisted_s": 0.0, "tokens": 0, "main_calls": 0, "draft_calls": 0, "identical": 0}
+    print(f"{'job':<5}{'tokens':>8}{'base s':>9}{'assisted s':>12}{'speed-up':>10}{'accept':>9}")
+    for i, messages in enumerate(conversations):
+        base_text, _, base_s = generate(messages)
+
+        main_counter, draft_counter = ForwardCounter(pipe.model), ForwardCounter(draft)
+        try:
+            text, tokens, assisted_s = generate(messages, draft)
+        finally:
+            main_counter.remove()
+            draft_counter.remove()
+
+        accepted = max(0, tokens - main_counter.calls)
+        acceptance = accepted / draft_counter.calls if draft_counter.calls else 0.0
+        print(f"{i:<5}{tokens:>8}{base_s:>9.2f}{assisted_s:>12.2f}{base_s / assisted_s:>9.2f}x{acceptance:>9.0%}")
+
+        totals["base_s"] += base_s
+        totals["assisted_s"] += assisted_s
+        totals["tokens"] += tokens
+        totals["main_calls"] += main_counter.calls
+        totals["draft_calls"] += draft_counter.calls
+        totals["identical"] += text == base_text
+
+    accepted = max(0, totals["tokens"] - totals["main_calls"])
+    print(f"overall speed-up {totals['base_s'] / totals['assisted_s']:.2f}x, "
+          f"acceptance {accepted / max(1, totals['draft_calls']):.0%}, "
+          f"{totals['tokens'] / max(1, totals['main_calls']):.1f} tokens per main-model pass, "
+          f"identical outputs {totals['identical']}/{len(conversations)}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,58 @@
+"""
+Compare CVs/second for one-at-a-time extract_job_titles against extract_job_titles_batch.
+
+Usage (from the project root):
+    python benchmarks/bench_title_batch.py --cv_dir <dir of .txt CVs>
+    python benchmarks/bench_title_batch.py --n 32 --batch_size 8
+
+Without --cv_dir, src/resume.txt is truncated to n different lengths to build n
+distinct CVs of varying size, which is what makes length sorting matter. The LLM
+cache is disabled so both passes run the model for every CV.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import fire
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import llm_cache
+import model_provider
+from llm import extract_job_titles, extract_job_titles_batch
+
+
+def load_cvs(cv_dir: str | None, n: int) -> list[str]:
+    if cv_dir:
+        return [p.read_text() for p in sorted(Path(cv_dir).glob("*.txt"))][:n]
+    base = (ROOT / "src" / "resume.txt").read_text()
+    return [base[: 200 + (len(base) - 200) * (i + 1) // n] for i in range(n)]
+
+
+def main(cv_dir: str | None = None, n: int = 16, batch_size: int = 8):
+    cv_texts = load_cvs(cv_dir, n)
+    llm_cache.set_enabled(False)
+    print(f"{len(cv_texts)} CVs, batch size {batch_size}")
+
+    print("load:", model_provider.warmup())
+    extract_job_titles(cv_texts[0])  # first call pays one-off CUDA/kernel set-up
+
+    start = time.perf_counter()
+    sequential = [extract_job_titles(cv) for cv in cv_texts]
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = extract_job_titles_batch(cv_texts, batch_size=batch_size)
+    batched_s = time.perf_counter() - start
+
+    same = sum(a == b for a, b in zip(sequential, batched))
+    print(f"{'mode':<12}{'seconds':>10}{'CVs/s':>10}")
+    print(f"{'sequential':<12}{sequential_s:>10.2f}{len(cv_texts) / sequential_s:>10.2f}")
+    print(f"{'batched':<12}{batched_s:>10.2f}{len(cv_texts) / batched_s:>10.2f}")
+    print(f"speed-up: {sequential_s / batched_s:.2f}x, identical outputs: {same}/{len(cv_texts)}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,147 @@
+"""
+In-process stand-ins for Nova Act and the local model, replaying recorded fixtures.
+
+FakeNovaAct answers act() calls from fixtures/reed/session.json: each prompt is
+matched against the recorded rules in order and gets the recorded response after
+the recorded latency (times latency_scale, so 0 measures pure overhead). Job
+details and results pages come from the fixture's listings, so process_jobs_*
+see the same data as a real Reed search would return.
+
+FakePipeline stands in for the transformers text-generation pipeline and replays
+fixtures/local_model/job_titles.json at the recorded decode speed.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from nova_act import ActAgentFailed, ActMetadata, ActResult
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+REED_SESSION = FIXTURES_DIR / "reed" / "session.json"
+LOCAL_MODEL_REPLY = FIXTURES_DIR / "local_model" / "job_titles.json"
+
+
+class FakeNovaAct:
+    """
+    Drop-in for NovaAct(starting_page=..., headless=...) that replays recorded act responses.
+
+    Counts act() calls per prompt rule in act_counts (shared by all sessions of a run).
+    """
+
+    act_counts = {}
+    _counts_lock = threading.Lock()
+
+    def __init__(self, starting_page: str, headless: bool = False, fixture: Path = REED_SESSION,
+                 latency_scale: float = 1.0, **kwargs):
+        session = json.loads(Path(fixture).read_text())
+        self.rules = [{**rule, "pattern": re.compile(rule["match"])} for rule in session["responses"]]
+        self.listings = session["listings"]
+        self.default_latency_s = session.get("default_latency_s", 0.0)
+        self.latency_scale = latency_scale
+        self.page = SimpleNamespace(url=starting_page)
+        self.session_id = uuid.uuid4().hex
+        self._current = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def go_to_url(self, url: str):
+        self.page.url = url
+        # opening a listing's own page selects it, as in bulk mode
+        self._current = next((i for i, job in enumerate(self.listings) if job["link"] == url), self._current)
+
+    def act(self, prompt: str, schema: dict | None = None, **kwargs) -> ActResult:
+        rule, match = next(
+            ((rule, m) for rule in self.rules if (m := rule["pattern"].search(prompt))), (None, None)
+        )
+        with FakeNovaAct._counts_lock:
+            key = rule["match"] if rule else "(unmatched)"
+            FakeNovaAct.act_counts[key] = FakeNovaAct.act_counts.get(key, 0) + 1
+
+        start = time.time()
+        latency = rule.get("latency_s", self.default_latency_s) if rule else self.default_latency_s
+        time.sleep(latency * self.latency_scale)
+        metadata = ActMetadata(
+            session_id=self.session_id, act_id=uuid.uuid4().hex, num_steps_executed=1,
+            start_time=start, end_time=time.time(), prompt=prompt,
+        )
+
+        if rule is None:
+            return ActResult(metadata=metadata, response=None, matches_schema=schema is None)
+
+        if rule.get("select") == "index":
+            index = int(match.group(1)) - 1
+            if index >= len(self.listings):
+                raise ActAgentFailed(f"There is no listing number {index + 1} on the page", metadata)
+            self._current = index
+            self.page.url = self.listings[index]["link"]
+
+        parsed = rule.get("parsed_response")
+        if parsed == "$listing":
+            parsed = self.listings[self._current] if self._current is not None else None
+        elif parsed == "$results":
+            parsed = {
+                "listings": [
+                    {"title": job["title"], "company": job["company"], "link": job["link"],
+                     "snippet": (job["description"] or "")[:200]}
+                    for job in self.listings
+                ],
+                "has_next_page": False,
+            }
+        return ActResult(
+            metadata=metadata,
+            response=json.dumps(parsed) if parsed is not None else rule.get("response"),
+            parsed_response=parsed,
+            valid_json=parsed is not None,
+            matches_schema=parsed is not None if schema is not None else None,
+        )
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer, enough for the token counts recorded in traces."""
+
+    pad_token = eos_token = "</s>"
+    eos_token_id = 0
+    padding_side = "left"
+
+    def __call__(self, text: str, add_special_tokens: bool = True, **kwargs) -> dict:
+        return {"input_ids": text.split()}
+
+    def apply_chat_template(self, messages: list[dict], add_generation_prompt: bool = False, **kwargs) -> list:
+        return " ".join(m["content"] for m in messages).split()
+
+
+class FakePipeline:
+    """Text-generation pipeline stand-in that replays one recorded reply at a fixed decode speed."""
+
+    def __init__(self, fixture: Path = LOCAL_MODEL_REPLY, latency_scale: float = 1.0):
+        recorded = json.loads(Path(fixture).read_text())
+        self.reply = recorded["reply"]
+        self.tokens_per_s = recorded["tokens_per_s"]
+        self.latency_scale = latency_scale
+        self.tokenizer = FakeTokenizer()
+        self.calls = 0
+
+    def __call__(self, messages, return_full_text: bool = False, **generation):
+        self.calls += 1
+        batched = bool(messages) and isinstance(messages[0], list)
+        batch = messages if batched else [messages]
+        # roughly 4 characters per token
+        time.sleep(len(self.reply) / 4 / self.tokens_per_s * self.latency_scale * len(batch))
+        outputs = [[{"generated_text": self.reply}] for _ in batch]
+        return outputs if batched else outputs[0]
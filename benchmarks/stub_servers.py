@@ -0,0 +1,248 @@
+"""
+Local HTTP stub servers standing in for external APIs, for offline benchmarks and testing.
+
+Each stub runs in a background thread on 127.0.0.1:
+    with serve(CSEStubHandler) as base_url:
+        ...  # point GOOGLE_CSE_ENDPOINT at f"{base_url}/customsearch/v1"
+
+    with serve(OpenAIStubHandler) as base_url:
+        ...  # point OPENAI_BASE_URL at f"{base_url}/v1"
+
+Run one from the command line to test against it by hand:
+    python benchmarks/stub_servers.py cse --port 9001
+    python benchmarks/stub_servers.py greenhouse --port 9002
+    python benchmarks/stub_servers.py openai --port 9003
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import fire
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Base handler: JSON responses, configurable latency, quiet logging."""
+
+    latency_s = 0.05
+    request_count = 0
+    _count_lock = threading.Lock()
+
+    def _next_request_number(self) -> int:
+        with StubHandler._count_lock:
+            type(self).request_count += 1
+            return type(self).request_count
+
+    def send_json(self, status: int, body, headers: dict | None = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CSEStubHandler(StubHandler):
+    """
+    Google Custom Search stand-in.
+
+    Returns 10 deterministic Greenhouse links per (q, start) and answers every
+    `rate_limit_every`-th request with a 429 to exercise backoff.
+    """
+
+    rate_limit_every = 7
+    total_results = 50
+
+    def do_GET(self):
+        number = self._next_request_number()
+        time.sleep(self.latency_s)
+
+        if self.rate_limit_every and number % self.rate_limit_every == 0:
+            return self.send_json(429, {"error": {"code": 429}}, {"Retry-After": "0"})
+
+        params = parse_qs(urlsplit(self.path).query)
+        query = params.get("q", [""])[0]
+        start = int(params.get("start", ["1"])[0])
+        num = int(params.get("num", ["10"])[0])
+
+        items = []
+        for rank in range(start, min(start + num, self.total_results + 1)):
+            digest = hashlib.sha1(f"{query}:{rank}".encode()).hexdigest()
+            # overlapping ids across queries so de-duplication has work to do
+            job_id = int(digest[:6], 16) % 120
+            items.append({
+                "title": f"Job {job_id}",
+                "link": f"https://boards.greenhouse.io/company{job_id % 12}/jobs/{job_id}",
+            })
+        self.send_json(200, {"items": items})
+
+
+class GreenhouseStubHandler(StubHandler):
+    """
+    Greenhouse job board API stand-in serving recorded feeds from fixtures/greenhouse/<token>.json.
+
+    Responses carry an ETag and Last-Modified derived from the fixture file and
+    a matching If-None-Match gets a 304, like the real API behind its CDN.
+    """
+
+    fixtures_dir = FIXTURES_DIR / "greenhouse"
+
+    def do_GET(self):
+        self._next_request_number()
+        time.sleep(self.latency_s)
+
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if len(parts) != 4 or parts[:2] != ["v1", "boards"] or parts[3] != "jobs":
+            return self.send_json(404, {"error": "not found"})
+
+        fixture = self.fixtures_dir / f"{parts[2]}.json"
+        if not fixture.exists():
+            return self.send_json(404, {"status": 404, "error": "Job board not found"})
+
+        data = fixture.read_bytes()
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        headers = {"ETag": etag, "Last-Modified": formatdate(fixture.stat().st_mtime, usegmt=True)}
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_json(200, json.loads(data), headers)
+
+
+class OpenAIStubHandler(StubHandler):
+    """
+    OpenAI Responses API stand-in (POST /v1/responses).
+
+    Requests with a json_schema text format (responses.parse) get the recorded
+    CVContent from fixtures/openai/cv_content.json, all others the recorded LaTeX
+    document from fixtures/openai/resume.tex. Tokens are estimated at 4 characters
+    each; a repeated prompt_cache_key reports the prefix shared with the previous
+    request under that key as cached, in 128-token blocks like the real prompt cache.
+
+    Each request takes latency_s plus output_tokens / output_tokens_per_s, and every
+    rate_limit_every-th request gets a 429 (server_error_every-th a 500).
+    """
+
+    latency_s = 0.5
+    output_tokens_per_s = 0.0
+    rate_limit_every = 0
+    server_error_every = 0
+    fixtures_dir = FIXTURES_DIR / "openai"
+    _prompts = {}
+
+    def do_POST(self):
+        number = self._next_request_number()
+        if urlsplit(self.path).path.rstrip("/") != "/v1/responses":
+            return self.send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.rate_limit_every and number % self.rate_limit_every == 0:
+            time.sleep(self.latency_s / 10)
+            return self.send_json(
+                429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                {"Retry-After": "0"},
+            )
+        if self.server_error_every and number % self.server_error_every == 0:
+            time.sleep(self.latency_s / 10)
+            return self.send_json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+
+        prompt = body.get("input", "")
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt)
+        structured = body.get("text", {}).get("format", {}).get("type") == "json_schema"
+        text = (self.fixtures_dir / ("cv_content.json" if structured else "resume.tex")).read_text()
+
+        input_tokens = max(1, len(prompt) // 4)
+        output_tokens = max(1, len(text) // 4)
+        cached_tokens = 0
+        key = body.get("prompt_cache_key")
+        if key:
+            with StubHandler._count_lock:
+                previous = OpenAIStubHandler._prompts.get(key)
+                OpenAIStubHandler._prompts[key] = prompt
+            if previous is not None:
+                shared = len(os.path.commonprefix([previous, prompt])) // 4
+                cached_tokens = shared // 128 * 128 if shared >= 1024 else 0
+
+        delay = self.latency_s
+        if self.output_tokens_per_s:
+            delay += output_tokens / self.output_tokens_per_s
+        time.sleep(delay)
+
+        response_id = f"resp_{number:08d}"
+        self.send_json(200, {
+            "id": response_id,
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": body.get("model", "gpt-5"),
+            "output": [{
+                "type": "message",
+                "id": f"msg_{number:08d}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "text": body.get("text", {"format": {"type": "text"}}),
+            "prompt_cache_key": key,
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": cached_tokens},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        })
+
+
+@contextmanager
+def serve(handler_cls, port: int = 0):
+    """Run handler_cls on 127.0.0.1 in a background thread and yield its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_cls)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+STUBS = {
+    "cse": CSEStubHandler,
+    "greenhouse": GreenhouseStubHandler,
+    "openai": OpenAIStubHandler,
+}
+
+
+def main(stub: str, port: int = 9001):
+    with serve(STUBS[stub], port) as base_url:
+        print(f"{stub} stub listening on {base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,226 @@
+"""
+Crawls the public Greenhouse job board API for every board in seeds/targets.csv.
+
+Boards are fetched concurrently over one pooled client. Conditional requests
+(ETag / If-Modified-Since) let unchanged boards be skipped with a 304. Jobs are
+normalised to JobDetails records and stored in a local SQLite database.
+
+Usage:
+    python greenhouse_crawler.py --targets seeds/targets.csv
+    python greenhouse_crawler.py --api_base http://127.0.0.1:9002   # local fixture server
+"""
+
+import asyncio
+import html
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import fire
+import httpx
+
+from tools import load_target_boards
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from models import JobDetails
+
+GREENHOUSE_API_BASE = os.getenv("GREENHOUSE_API_BASE", "https://boards-api.greenhouse.io")
+STORE_PATH = os.getenv("GREENHOUSE_STORE_PATH", ".cache/greenhouse_jobs.sqlite")
+MAX_CONCURRENT_BOARDS = 8
+
+
+def board_token(board: dict) -> str | None:
+    """The board token is the first path segment of a boards.greenhouse.io careers URL."""
+    url = board.get("board_url") or ""
+    path = urlsplit(url).path.strip("/")
+    if "greenhouse.io" in url and path:
+        return path.split("/")[0]
+    return board.get("name") or None
+
+
+def _html_to_text(content: str) -> str:
+    # the API returns the job description as escaped HTML
+    text = html.unescape(content or "")
+    text = re.sub(r"<(br|/p|/li|/h\d)\s*/?>", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = html.unescape(text)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+def normalize_job(job: dict, company: str) -> JobDetails | None:
+    """The job as a JobDetails record, or None if it has no link to apply through."""
+    link = job.get("absolute_url")
+    if not link:
+        return None
+    return JobDetails(
+        title=(job.get("title") or "").strip(),
+        company=company,
+        location=(job.get("location") or {}).get("name"),
+        salary=None,
+        description=_html_to_text(job.get("content") or ""),
+        link=link,
+    )
+
+
+def parse_board(response: httpx.Response, token: str, company: str) -> list[JobDetails]:
+    """
+    Normalise a board's job feed, skipping (and logging) jobs that cannot be normalised.
+
+    Raises:
+        ValueError: if the body is not a JSON object with a "jobs" list
+    """
+    feed = response.json()
+    jobs = feed.get("jobs", []) if isinstance(feed, dict) else None
+    if not isinstance(jobs, list):
+        raise ValueError("expected a JSON object with a 'jobs' list")
+
+    normalized = []
+    for job in jobs:
+        try:
+            details = normalize_job(job, company) if isinstance(job, dict) else None
+        except (AttributeError, ValueError):
+            details = None
+        if details is None:
+            job_id = job.get("id") if isinstance(job, dict) else None
+            print(f"Skipping malformed job {job_id} on board '{token}'")
+            continue
+        normalized.append(details)
+    return normalized
+
+
+class JobStore:
+    def __init__(self, path: str = STORE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS boards ("
+            " token TEXT PRIMARY KEY,"
+            " company TEXT,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " link TEXT PRIMARY KEY,"
+            " board TEXT NOT NULL,"
+            " title TEXT, company TEXT, location TEXT, salary TEXT, description TEXT,"
+            " updated_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_board ON jobs(board)")
+        self.conn.commit()
+
+    def validators(self, token: str) -> tuple[str | None, str | None]:
+        row = self.conn.execute("SELECT etag, last_modified FROM boards WHERE token = ?", (token,)).fetchone()
+        return row if row else (None, None)
+
+    def touch_board(self, token: str):
+        self.conn.execute("UPDATE boards SET fetched_at = ? WHERE token = ?", (time.time(), token))
+        self.conn.commit()
+
+    def replace_board(self, token: str, company: str, etag: str | None, last_modified: str | None,
+                      jobs: list[JobDetails]):
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO boards (token, company, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (token, company, etag, last_modified, now),
+            )
+            self.conn.execute("DELETE FROM jobs WHERE board = ?", (token,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO jobs"
+                " (link, board, title, company, location, salary, description, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(j.link, token, j.title, j.company, j.location, j.salary, j.description, now) for j in jobs],
+            )
+
+    def jobs(self, board: str | None = None) -> list[JobDetails]:
+        query = "SELECT title, company, location, salary, description, link FROM jobs"
+        rows = self.conn.execute(query + " WHERE board = ?", (board,)) if board else self.conn.execute(query)
+        fields = ("title", "company", "location", "salary", "description", "link")
+        return [JobDetails(**dict(zip(fields, row))) for row in rows]
+
+
+async def _fetch_board(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, api_base: str,
+                       token: str, etag: str | None, last_modified: str | None) -> httpx.Response:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    async with semaphore:
+        return await client.get(f"{api_base}/v1/boards/{token}/jobs", params={"content": "true"}, headers=headers)
+
+
+async def crawl_boards(
+    boards: list[dict],
+    store: JobStore,
+    api_base: str = GREENHOUSE_API_BASE,
+    concurrency: int = MAX_CONCURRENT_BOARDS,
+) -> dict:
+    """
+    Fetch every board's job feed and write changed boards to store.
+
+    Returns:
+        dict: board token -> {"status": "updated" | "unchanged" | "error", "jobs": int}
+    """
+    targets = {}
+    for board in boards:
+        token = board_token(board)
+        if token:
+            targets[token] = board.get("company") or board.get("name") or token
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=15.0) as client:
+        responses = await asyncio.gather(
+            *(_fetch_board(client, semaphore, api_base, token, *store.validators(token)) for token in targets),
+            return_exceptions=True,
+        )
+
+    summary = {}
+    for (token, company), response in zip(targets.items(), responses):
+        if isinstance(response, Exception):
+            print(f"Failed to fetch board '{token}': {response}")
+            summary[token] = {"status": "error", "jobs": 0}
+        elif response.status_code == 304:
+            store.touch_board(token)
+            summary[token] = {"status": "unchanged", "jobs": 0}
+        elif response.status_code != 200:
+            print(f"Board '{token}' returned HTTP {response.status_code}")
+            summary[token] = {"status": "error", "jobs": 0}
+        else:
+            try:
+                jobs = parse_board(response, token, company)
+            except ValueError as e:
+                print(f"Board '{token}' returned a malformed feed: {e}")
+                summary[token] = {"status": "error", "jobs": 0}
+                continue
+            store.replace_board(
+                token, company, response.headers.get("ETag"), response.headers.get("Last-Modified"), jobs
+            )
+            summary[token] = {"status": "updated", "jobs": len(jobs)}
+    return summary
+
+
+def main(targets: str = "seeds/targets.csv", api_base: str = GREENHOUSE_API_BASE,
+         store: str = STORE_PATH, concurrency: int = MAX_CONCURRENT_BOARDS):
+    boards = load_target_boards(targets)
+    start = time.perf_counter()
+    summary = asyncio.run(crawl_boards(boards, JobStore(store), api_base=api_base, concurrency=concurrency))
+    elapsed = time.perf_counter() - start
+
+    for token, result in summary.items():
+        print(f"{token:<30} {result['status']:<10} {result['jobs']} jobs")
+    counts = [r["status"] for r in summary.values()]
+    print(f"{len(summary)} boards in {elapsed:.1f}s: "
+          f"{counts.count('updated')} updated, {counts.count('unchanged')} unchanged, {counts.count('error')} errors")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -1,158 +1,16 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
-import transformers
-import torch
-import json, re
+import sys
 from pydantic import BaseModel
 from nova_act import NovaAct, ActAgentError
 import fire
 from fpdf import FPDF
 
-
-MODEL_ID = "meta-llama/Llama-3.1-8B-Instruct"
-pipeline = transformers.pipeline(
-    "text-generation",
-    model=MODEL_ID,
-    model_kwargs={"dtype": torch.bfloat16},
-    device_map="auto",
-)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from llm import extract_job_titles, generate_tailored_resume
 
 os.makedirs("outputs", exist_ok=True)
 
-SYSTEM_PROMPT = """
-You read a CV and return ONLY a JSON array of job titles the candidate is qualified for.
-
-Rules:
-- Output ONLY a JSON array of strings.
-- No explanation. No commentary. No markdown.
-- ATS-standard job titles only.
-- Titles must reflect demonstrated experience and skills.
-
-Output format example:
-["Data Scientist", "Machine Learning Engineer", "Quantitative Analyst"]
-"""
-
-def extract_job_titles(cv_text: str) -> list[str]:
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": cv_text},
-    ]
-    out = pipeline(messages, max_new_tokens=128, return_full_text=False)
-    raw = out[0]["generated_text"]
-    match = re.search(r'\[[^\]]*\]', raw)
-    return json.loads(match.group(0)) if match else []
-
-
-RESUME_SYSTEM = """
-You generate a tailored resume for a specific job.
-Follow the template exactly.
-Insert only verifiable content from the CV.
-No hallucinations.
-No cover letter.
-ATS-safe.
-Return only the completed resume text.
-"""
-
-RESUME_TEMPLATE = """
-FULL NAME  
-City, Country  
-Phone | Email | LinkedIn | GitHub (optional)
-
-SUMMARY  
-Motivated <role> with experience in <key expertise areas>. Skilled in <top skills>.  
-Strong background in <domain>, with practical experience in <project/industry>.  
-Interested in opportunities in <target industry/role>.
-
-EDUCATION  
-UNIVERSITY NAME — Location  
-Degree Title | Graduation Year  
-Key modules: <modules>  
-Highlights: <awards, classifications, academic focus>
-
-UNIVERSITY NAME — Location  
-Degree Title | Graduation Year  
-Key modules: <modules>  
-Highlights: <awards, classifications, academic focus>
-
-PROFESSIONAL EXPERIENCE  
-INSTITUTION / COMPANY — Location  
-Role Title | Dates (Month YYYY – Month YYYY)  
-• <quantified achievement or responsibility>  
-• <work that demonstrates skill applied>  
-• <results, metrics, systems or technologies>
-
-INSTITUTION / COMPANY — Location  
-Role Title | Dates  
-• <quantified achievement or responsibility>  
-• <work that demonstrates skill applied>  
-• <results, metrics, systems or technologies>
-
-PROJECTS  
-PROJECT / RESEARCH TITLE  
-• <short one-sentence project description>  
-• Tech stack: <tools> | Key results: <metrics>  
-• <Outcome or contribution>
-
-PROJECT / RESEARCH TITLE  
-• <short one-sentence project description>  
-• Tech stack: <tools> | Key results: <metrics>  
-• <Outcome or contribution>
-
-SKILLS  
-Languages/Frameworks: <list>  
-ML / Data: <list>  
-Tools: <list>  
-Databases: <list>  
-Cloud/DevOps (optional): <list>
-
-CERTIFICATIONS  
-• <Certification Name> — <Issuing Org>  
-• <Certification Name> — <Issuing Org>
-
-LANGUAGES  
-• <Language> (Level)  
-• <Language> (Level)
-
-ADDITIONAL INFO (optional)  
-• Interests: <list>  
-• Visa status (if relevant): <e.g., Right to Work UK>  
-"""
-
-def generate_tailored_resume(cv_text: str, job: dict) -> str:
-    prompt = f"""
-Job title: {job.get('title')}
-Company: {job.get('company')}
-Location: {job.get('location')}
-Salary: {job.get('salary')}
-Job link: {job.get('link')}
-
-Job description (from listing if extracted):
-{job.get('description', '')}
-
-Template:
-{RESUME_TEMPLATE}
-
-CV:
-{cv_text}
-"""
-    # prompt = prompt[-4000:] 
-
-    msgs = [
-        {"role": "system", "content": RESUME_SYSTEM},
-        {"role": "user", "content": prompt},
-    ]
-
-    out = pipeline(
-        msgs,
-        max_new_tokens=512,
-        return_full_text=False,
-        do_sample=False,           # <-- key
-        temperature=0.0,           # <-- key
-        top_p=1.0
-    )
-
-    return out[0]["generated_text"]
-
 def save_resume_pdf(text: str, name: str) -> str:
     filename = f"outputs/{name.replace(' ', '_')}.pdf"
     pdf = FPDF()
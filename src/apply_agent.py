@@ -1,14 +1,41 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from nova_act import NovaAct, ActAgentError
-from models import JobDetails, CompanyBullets
+from urllib.parse import urljoin
+from models import JobDetails, JobListing, SearchResultsPage, CompanyBullets
 from create_optimised_cv import create_optimised_cv
 from dotenv import load_dotenv
 import os
 from utils import make_filename
+from seen_index import APPLIED, FAILED, get_index
+import ranking
+import tracing
 
 load_dotenv()
 
 REED_EMAIL = os.getenv("REED_EMAIL")
 REED_PASSWORD = os.getenv("REED_PASSWORD")
+REED_URL = "https://www.reed.co.uk"
+# with ranking on, open this many times `limit` of the best listings, leaving spares for pages that fail
+RANK_OVERSAMPLE = 2
+MAX_RESULT_PAGES = 3
+
+JOB_DETAILS_PROMPT = (
+    "Read visible job information on this page to assist the user. "
+    "Capture the job title, company, location, salary if shown, "
+    "the job description text, and the apply button link. "
+    "Provide the information in the requested structured format "
+    "to help the user manually review the listing."
+)
+
+SEARCH_RESULTS_PROMPT = (
+    "Read every job listing in the search results on this page. "
+    "For each listing capture the job title, company, the link to the listing "
+    "and the short summary text shown under it. "
+    "Also report whether there is a next page of results."
+)
 
 def process_jobs_sequential(
     job_title: str,
@@ -16,41 +43,146 @@ def process_jobs_sequential(
     headless: bool = False,
     limit: int = 3,
     demo: bool = False
-):
-    with NovaAct(starting_page="https://www.reed.co.uk", headless=headless) as n:
+) -> int:
+    with NovaAct(starting_page=REED_URL, headless=headless) as n:
+        return process_jobs_in_session(tracing.trace_browser(n), job_title, cv_text, limit=limit, demo=demo)
+
+
+def process_titles_parallel(
+    titles,
+    cv_text: str,
+    workers: int = 2,
+    headless: bool = False,
+    limit: int = 3,
+    demo: bool = False,
+    pipeline: bool = False,
+    bulk: bool = False
+) -> dict:
+    """
+    Fan job titles out over a bounded pool of NovaAct browser sessions.
+
+    Each worker thread owns one browser for its lifetime and pulls the next title
+    when it finishes the previous one. A title that fails is recorded and its
+    browser restarted; the other titles carry on.
+
+    Args:
+        titles: iterable of job titles, consumed lazily
+        cv_text (str): candidate CV text
+        workers (int): number of concurrent browser sessions
+        pipeline (bool): use process_jobs_pipelined instead of process_jobs_in_session
+        bulk (bool): use process_jobs_bulk instead of process_jobs_in_session
+
+    Returns:
+        dict: title -> {"processed": int, "error": str | None}, in input order
+
+    Raises:
+        Exception: the first error that stopped a worker outside a title's run,
+            e.g. one raised by the titles iterator
+    """
+    if bulk:
+        process = process_jobs_bulk
+    elif pipeline:
+        process = process_jobs_pipelined
+    else:
+        process = process_jobs_in_session
+    title_iter = enumerate(titles)
+    title_lock = threading.Lock()
+    results = {}
+
+    def next_title():
+        with title_lock:
+            return next(title_iter, None)
+
+    def worker():
+        session = None
         try:
+            while (item := next_title()) is not None:
+                index, title = item
+                print(f"\n=== Running for: {title} ===")
+                try:
+                    if session is None:
+                        session = tracing.trace_browser(NovaAct(starting_page=REED_URL, headless=headless))
+                        session.start()
+                    else:
+                        session.go_to_url(REED_URL)
+                    with tracing.stage("title", title=title):
+                        processed = process(session, title, cv_text, limit=limit, demo=demo)
+                    results[index] = (title, {"processed": processed, "error": None})
+                except Exception as e:
+                    print(f"Run for '{title}' failed: {e}")
+                    results[index] = (title, {"processed": 0, "error": repr(e)})
+                    _stop_session(session)
+                    session = None
+        finally:
+            _stop_session(session)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+
+    # a worker only dies on errors outside a title's run, e.g. from the titles iterator;
+    # the titles it would have run are missing, so the run as a whole has failed
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    for error in errors:
+        print(f"Browser worker died: {error!r}")
+    if errors:
+        raise errors[0]
+
+    return dict(results[i] for i in sorted(results))
+
+
+def _stop_session(session):
+    if session is None:
+        return
+    try:
+        session.stop()
+    except Exception as e:
+        print(f"Failed to stop browser session: {e}")
+
+
+def process_jobs_in_session(
+    n,
+    job_title: str,
+    cv_text: str,
+    limit: int = 3,
+    demo: bool = False,
+    max_pages: int = MAX_RESULT_PAGES
+) -> int:
+    """
+    Search Reed for job_title in an open NovaAct session and apply to up to limit jobs.
+
+    Listings are taken in results order, reading further results pages (up to
+    max_pages) only until limit jobs have been processed. Each page's links are read
+    first, so listings already processed are skipped without being opened.
+    """
+    try:
+        with tracing.stage("search", title=job_title):
             n.act(
                 f"Close cookie banner if present. "
                 f"Search for '{job_title}' in London and submit search."
             )
-        except ActAgentError:
-            print("Search failed")
-            return
+    except ActAgentError:
+        print("Search failed")
+        return 0
 
-        jobs_processed = 0
-        result_index = 0
+    jobs_processed = 0
+    listings = (listing for page in iter_search_pages(n, max_pages) for listing in page)
 
-        while jobs_processed < limit:
+    for listing in listings:
+        if jobs_processed >= limit:
+            break
+        if _already_processed(listing.link, listing.title, listing.company):
+            continue
+        with tracing.job(search=job_title, title=listing.title, company=listing.company):
             try:
-                n.act(f"Click the job listing number {result_index + 1} on the page.")
-
-                res = n.act(
-                    "Read visible job information on this page to assist the user. "
-                    "Capture the job title, company, location, salary if shown, "
-                    "the job description text, and the apply button link. "
-                    "Provide the information in the requested structured format "
-                    "to help the user manually review the listing.",
-                    schema=JobDetails.model_json_schema()
-                )
+                with tracing.stage("scrape"):
+                    n.go_to_url(listing.link)
+                    res = n.act(JOB_DETAILS_PROMPT, schema=JobDetails.model_json_schema())
 
                 if not res.matches_schema:
                     print("Schema mismatch, skipping")
-                    n.act("Close job details or navigate back to results")
-                    result_index += 1
                     continue
 
                 job = JobDetails.model_validate(res.parsed_response).model_dump()
-
                 print(f"\n=== Processing: {job['title']} @ {job['company']} ===")
 
                 # try:
@@ -80,33 +212,324 @@ def process_jobs_sequential(
                 #     company_summary = "- Public company information unavailable"
                 #     print("Company info lookup failed. Proceeding without.")
 
-                filename = make_filename(job.get("title", ""), job.get("company", ""))
-                resume_path = create_optimised_cv(
-                    extended_cv=cv_text,
-                    job_description=job.get("description", ""),
-                    output_dir=f"outputs/",
-                    filename=filename
-                )
+                resume_path = tailor_cv(job, cv_text, listing.link)
                 print(f"Saved CV → {resume_path}")
 
-                apply_to_job(n, job, resume_path)
-
+                applied = apply_to_job(n, job, resume_path)
+                _record_application(listing.link, job, applied)
                 jobs_processed += 1
-                print(f"Applied Successfully")
 
                 if demo:
                     print("Demo: stopping after first job")
-                    return
-
-                n.act("Close job details and return to results page")
-
-                result_index += 1
+                    return jobs_processed
+                # stop before the next results page is read
+                if jobs_processed >= limit:
+                    break
 
             except ActAgentError:
                 print("Error during job flow, stopping")
                 break
 
-def apply_to_job(n, job: dict, resume_path: str):
+    return jobs_processed
+
+def process_jobs_pipelined(
+    n,
+    job_title: str,
+    cv_text: str,
+    limit: int = 3,
+    demo: bool = False,
+    prefetch: int = 2,
+    max_pages: int = MAX_RESULT_PAGES
+) -> int:
+    """
+    Like process_jobs_in_session, but tailors CVs in the background while the browser works.
+
+    The browser scrapes listing N+1 while a background executor generates and
+    compiles the CV for listing N. Once prefetch CVs are in flight, the browser
+    applies to the oldest finished one before scraping more, which bounds memory.
+    Per-stage timings are printed at the end so the bottleneck is visible.
+    """
+    try:
+        with tracing.stage("search", title=job_title):
+            n.act(
+                f"Close cookie banner if present. "
+                f"Search for '{job_title}' in London and submit search."
+            )
+    except ActAgentError:
+        print("Search failed")
+        return 0
+
+    pages = iter_search_pages(n, max_pages)
+    listings = deque()
+    exhausted = False
+    timings = {"scrape": [], "tailor": [], "wait": [], "apply": []}
+    pending = deque()
+    jobs_processed = 0
+
+    def tailor(job: dict, listing_url: str) -> str:
+        start = time.perf_counter()
+        try:
+            return tailor_cv(job, cv_text, listing_url)
+        finally:
+            timings["tailor"].append(time.perf_counter() - start)
+
+    def apply_next() -> bool:
+        job, listing_url, future = pending.popleft()
+        start = time.perf_counter()
+        try:
+            resume_path = future.result()
+        except Exception as e:
+            print(f"CV generation failed for {job['title']} @ {job['company']}: {e}")
+            _mark(listing_url, job, FAILED)
+            return False
+        finally:
+            timings["wait"].append(time.perf_counter() - start)
+        print(f"Saved CV → {resume_path}")
+
+        start = time.perf_counter()
+        n.go_to_url(listing_url)
+        applied = apply_to_job(n, job, resume_path)
+        _record_application(listing_url, job, applied)
+        timings["apply"].append(time.perf_counter() - start)
+        return True
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        try:
+            while jobs_processed < limit:
+                want_more = not exhausted and jobs_processed + len(pending) < limit
+                if want_more and not listings:
+                    # read the next results page only once this one is used up
+                    page = next(pages, None)
+                    if page is None:
+                        exhausted = True
+                    listings.extend(page or [])
+                    continue
+                if want_more and len(pending) < prefetch:
+                    listing = listings.popleft()
+                    if _already_processed(listing.link, listing.title, listing.company):
+                        continue
+                    start = time.perf_counter()
+                    try:
+                        with tracing.stage("scrape"):
+                            n.go_to_url(listing.link)
+                            res = n.act(JOB_DETAILS_PROMPT, schema=JobDetails.model_json_schema())
+                    except ActAgentError:
+                        print("Could not scrape further listings, finishing queued jobs")
+                        exhausted = True
+                        continue
+                    timings["scrape"].append(time.perf_counter() - start)
+
+                    if res.matches_schema:
+                        job = JobDetails.model_validate(res.parsed_response).model_dump()
+                        print(f"\n=== Queued: {job['title']} @ {job['company']} ===")
+                        pending.append((job, listing.link, executor.submit(tracing.bind(tailor), job, listing.link)))
+                    else:
+                        print("Schema mismatch, skipping")
+                    continue
+
+                if not pending:
+                    break
+
+                if apply_next():
+                    jobs_processed += 1
+                    if demo:
+                        print("Demo: stopping after first job")
+                        break
+
+        except ActAgentError:
+            print("Error during job flow, stopping")
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+    _print_stage_timings(job_title, timings)
+    return jobs_processed
+
+
+def iter_search_pages(n, max_pages: int = MAX_RESULT_PAGES):
+    """
+    Yield the listings of the current search results, one results page at a time, in
+    one act call per page. The next page is only read when the caller asks for it,
+    and the caller may open listings in between: the results page is reopened before
+    'Next' is clicked. Listings are de-duplicated by link across pages; pagination
+    stops after max_pages pages or at the first page that cannot be read.
+    """
+    seen = set()
+    for page in range(max_pages):
+        results_url = n.page.url
+        try:
+            with tracing.stage("results_page", page=page + 1):
+                res = n.act(SEARCH_RESULTS_PROMPT, schema=SearchResultsPage.model_json_schema())
+        except ActAgentError as e:
+            print(f"Could not read results page {page + 1}: {e}")
+            return
+        if not res.matches_schema:
+            print(f"Schema mismatch on results page {page + 1}, stopping pagination")
+            return
+
+        results = SearchResultsPage.model_validate(res.parsed_response)
+        listings = []
+        for listing in results.listings:
+            listing.link = urljoin(REED_URL, listing.link)
+            if listing.link not in seen:
+                seen.add(listing.link)
+                listings.append(listing)
+        yield listings
+
+        if not results.has_next_page or page + 1 == max_pages:
+            return
+        try:
+            if n.page.url != results_url:
+                n.go_to_url(results_url)
+            n.act("Click the 'Next' page button at the bottom of the search results.")
+        except ActAgentError as e:
+            print(f"Could not open results page {page + 2}: {e}")
+            return
+
+
+def extract_search_results(n, max_pages: int = MAX_RESULT_PAGES) -> list[JobListing]:
+    """
+    Extract every listing on the current search results page in one act call per page,
+    following pagination for up to max_pages pages. Listings are de-duplicated by link.
+    """
+    return [listing for page in iter_search_pages(n, max_pages) for listing in page]
+
+
+def title_filter(job_title: str):
+    """Keep listings whose title or snippet mentions at least one word of the searched title."""
+    words = {w for w in job_title.lower().split() if len(w) > 2}
+
+    def matches(listing: JobListing) -> bool:
+        text = f"{listing.title} {listing.snippet or ''}".lower()
+        return not words or any(w in text for w in words)
+
+    return matches
+
+
+def process_jobs_bulk(
+    n,
+    job_title: str,
+    cv_text: str,
+    limit: int = 3,
+    demo: bool = False,
+    max_pages: int = MAX_RESULT_PAGES,
+    listing_filter=None
+) -> int:
+    """
+    Like process_jobs_in_session, but reads whole results pages at once.
+
+    All listings are extracted from the results pages in one act call per page,
+    filtered, and only the listings that pass are opened for full details,
+    instead of clicking into and back out of every listing. With ranking enabled
+    the candidates are ordered by relevance to the CV and cut to the best few first.
+    """
+    try:
+        with tracing.stage("search", title=job_title) as span:
+            n.act(
+                f"Close cookie banner if present. "
+                f"Search for '{job_title}' in London and submit search."
+            )
+            listings = extract_search_results(n, max_pages=max_pages)
+            span.set_attribute("listings", len(listings))
+    except ActAgentError:
+        print("Search failed")
+        return 0
+
+    listing_filter = listing_filter or title_filter(job_title)
+    candidates = [
+        listing for listing in listings
+        if listing_filter(listing) and not _already_processed(listing.link, listing.title, listing.company)
+    ]
+    print(f"{len(candidates)}/{len(listings)} new listings pass the filter for '{job_title}'")
+    if ranking.ENABLED:
+        with tracing.stage("rank", candidates=len(candidates)):
+            ranked = ranking.rank_listings(cv_text, candidates, top_k=limit * RANK_OVERSAMPLE)
+        candidates = [listing for listing, _ in ranked]
+
+    jobs_processed = 0
+    for listing in candidates:
+        if jobs_processed >= limit:
+            break
+        with tracing.job(search=job_title, title=listing.title, company=listing.company):
+            try:
+                with tracing.stage("scrape"):
+                    n.go_to_url(listing.link)
+                    res = n.act(JOB_DETAILS_PROMPT, schema=JobDetails.model_json_schema())
+                if not res.matches_schema:
+                    print(f"Schema mismatch for {listing.link}, skipping")
+                    continue
+
+                job = JobDetails.model_validate(res.parsed_response).model_dump()
+                print(f"\n=== Processing: {job['title']} @ {job['company']} ===")
+
+                resume_path = tailor_cv(job, cv_text, listing.link)
+                print(f"Saved CV → {resume_path}")
+
+                applied = apply_to_job(n, job, resume_path)
+                _record_application(listing.link, job, applied)
+                jobs_processed += 1
+
+                if demo:
+                    print("Demo: stopping after first job")
+                    break
+
+            except ActAgentError:
+                print(f"Error processing {listing.link}, moving on")
+
+    return jobs_processed
+
+
+def _already_processed(listing_url: str, title: str, company: str) -> bool:
+    index = get_index()
+    if not index.skip_processed:
+        return False
+    if index.is_processed(listing_url, title, company):
+        print(f"Already applied to {title} @ {company}, skipping")
+        return True
+    return False
+
+
+def _mark(listing_url: str, job: dict, status: str):
+    # key by the Reed listing URL, not the apply link the details prompt fills in,
+    # so the mark matches the check made before the listing is opened
+    get_index().mark({**job, "link": listing_url}, status)
+
+
+def _record_application(listing_url: str, job: dict, applied: bool):
+    _mark(listing_url, job, APPLIED if applied else FAILED)
+    if applied:
+        print("Applied Successfully")
+    else:
+        print(f"Application not completed for {job['title']} @ {job['company']}, marked as failed")
+
+
+def tailor_cv(job: dict, cv_text: str, listing_url: str) -> str:
+    with tracing.stage("tailor_cv", company=job.get("company")):
+        return create_optimised_cv(
+            extended_cv=cv_text,
+            job_description=job.get("description", ""),
+            output_dir="outputs/",
+            # the link keeps listings with the same title and company (tailored concurrently
+            # when pipelined) from writing to the same files
+            filename=make_filename(job.get("title", ""), job.get("company", ""), listing_url)
+        )
+
+
+def _print_stage_timings(job_title: str, timings: dict):
+    print(f"\nStage timings for '{job_title}':")
+    for stage, values in timings.items():
+        if values:
+            print(f"  {stage:<7} n={len(values):<3} total={sum(values):7.1f}s mean={sum(values) / len(values):6.1f}s")
+
+
+def apply_to_job(n, job: dict, resume_path: str) -> bool:
+    with tracing.stage("apply", company=job.get("company")) as span:
+        applied = _apply_to_job(n, job, resume_path)
+        span.set_attribute("applied", applied)
+        return applied
+
+
+def _apply_to_job(n, job: dict, resume_path: str) -> bool:
     try:
         must_login = n.act(
             "Check if this page is a login screen. "
@@ -126,9 +549,11 @@ def apply_to_job(n, job: dict, resume_path: str):
             "Fill only basic required fields with placeholder text to help the user begin the process. "
             "Pause and present the form for user review before any submission."
         )
+        return True
 
     except ActAgentError:
         print(f"Apply failed for {job.get('title')} @ {job.get('company')}")
+        return False
 
 def reed_login(n):
     try:
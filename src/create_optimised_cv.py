@@ -2,13 +2,45 @@
 Takes the extended_cv and job_description as a string, and saves an optimised_cv.pdf file locally.
 Requires LaTeX installed.
 Add env variable with OPENAI_API_KEY.
+
+create_optimised_cvs() tailors CVs for many jobs at once on the async path: one shared
+AsyncOpenAI client per event loop with a bounded connection pool, at most MAX_IN_FLIGHT
+requests in flight, a token-bucket limit of REQUESTS_PER_MINUTE and jittered
+exponential backoff on 429 and 5xx responses.
 """
 
 
+import asyncio
+import hashlib
 import os
-import subprocess
+import random
+import threading
+import time
+import weakref
 from pathlib import Path
-from openai import OpenAI
+import httpx
+from openai import APIConnectionError, AsyncOpenAI, DefaultAsyncHttpxClient, InternalServerError, OpenAI, RateLimitError
+from llm_cache import cached, cached_async, forget
+from latex import LatexCompileError, compile_tex
+from models import CVContent, JobDetails
+from cv_template import render_cv
+from utils import make_filename
+import tracing
+
+MODEL = "gpt-5"
+# USD per 1M tokens, used for the per-call cost estimate
+PRICE_PER_M_TOKENS = {"input": 1.25, "cached_input": 0.125, "output": 10.0}
+
+# Structured mode: the model returns CVContent JSON and the fixed template is rendered locally
+STRUCTURED_OUTPUT = os.getenv("CV_STRUCTURED_OUTPUT", "") in ("1", "true", "True")
+
+# async path: concurrent requests (and pooled connections), request rate and retries on 429 / 5xx
+MAX_IN_FLIGHT = int(os.getenv("CV_MAX_IN_FLIGHT", 4))
+REQUESTS_PER_MINUTE = float(os.getenv("CV_REQUESTS_PER_MINUTE", 60))
+MAX_RETRIES = int(os.getenv("CV_MAX_RETRIES", 5))
+RETRY_BASE_S = 1.0
+RETRY_MAX_S = 60.0
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
 
 SYSTEM_PROMPT = r"""You are going to be provided with a long list of a portfolio of a user. You will also be provided with a job listing description. Tailor the CV to show both the most impressive and well-rounded sides of the applicant, but also choosing experiences with an emphasis on usefulness for this role.
 
@@ -241,34 +273,260 @@ Use this template and replace the content with the content from the cv, and prod
 """
 
 
-def create_optimised_cv(extended_cv: str, job_description: str, output_dir: str, filename: str) -> str:
-    """
-    Creates an optimised one-page CV in LaTeX and outputs .tex and .pdf in output_dir.
+STRUCTURED_PROMPT = """You are going to be provided with a long list of a portfolio of a user. You will also be provided with a job listing description. Tailor the CV to show both the most impressive and well-rounded sides of the applicant, but also choosing experiences with an emphasis on usefulness for this role.
 
-    Args:
-        extended_cv (str): extended CV text or path
-        job_description (str): job description text or path
-        output_dir (str): folder to write .tex and .pdf
-        filename (str): filename of .text and .pdf files
+Return only the content of the CV in the requested structured format; it will be typeset into a fixed one-page LaTeX template.
+- Use plain text only: no LaTeX commands, no markdown.
+- Include only verifiable content from the portfolio.
+- The CV must fill one page but not more: typically 2 education entries, 3 experience entries with 3-5 bullets each, 2-3 projects with 2-4 bullets each and 3-4 skill categories.
+- Dates are short ranges such as "Jun 2022 -- Sep 2022".
+"""
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _openai_client() -> OpenAI:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                if not client.api_key:
+                    raise ValueError("OPENAI_API_KEY not set.")
+                _client = client
+    return _client
+
+
+def _report_usage(response, start: float):
+    usage = response.usage
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    cost = (
+        (usage.input_tokens - cached_tokens) * PRICE_PER_M_TOKENS["input"]
+        + cached_tokens * PRICE_PER_M_TOKENS["cached_input"]
+        + usage.output_tokens * PRICE_PER_M_TOKENS["output"]
+    ) / 1_000_000
+    tracing.record(**{
+        "openai.input_tokens": usage.input_tokens, "openai.cached_tokens": cached_tokens,
+        "openai.output_tokens": usage.output_tokens, "openai.cost_usd": cost,
+    })
+    print(f"{MODEL}: {time.perf_counter() - start:.1f}s, "
+          f"{usage.input_tokens} input ({cached_tokens} cached) / {usage.output_tokens} output tokens, "
+          f"~${cost:.4f}")
 
-    Returns:
-        str: absolute path to generated PDF
-    """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    if not client.api_key:
-        raise ValueError("OPENAI_API_KEY not set.")
 
-    combined_prompt = f"{SYSTEM_PROMPT}\n\nEXTENDED CV:\n{extended_cv}\n\nJOB:\n{job_description}"
+def _prompt_cache_key(prompt: str, extended_cv: str) -> str:
+    # route every call that shares the instructions + CV prefix to the same prompt cache
+    return "cv-" + hashlib.sha256(f"{prompt}\n{extended_cv}".encode("utf-8")).hexdigest()[:32]
 
-    response = client.responses.create(model="gpt-5", input=combined_prompt)
-    latex_content = response.output_text
 
+def _full_request(extended_cv: str, job_description: str) -> dict:
+    return {
+        "model": MODEL,
+        "input": f"{SYSTEM_PROMPT}\n\nEXTENDED CV:\n{extended_cv}\n\nJOB:\n{job_description}",
+        "prompt_cache_key": _prompt_cache_key(SYSTEM_PROMPT, extended_cv),
+    }
+
+
+def _structured_request(extended_cv: str, job_description: str) -> dict:
+    return {
+        "model": MODEL,
+        "input": f"{STRUCTURED_PROMPT}\n\nEXTENDED CV:\n{extended_cv}\n\nJOB:\n{job_description}",
+        "text_format": CVContent,
+        "prompt_cache_key": _prompt_cache_key(STRUCTURED_PROMPT, extended_cv),
+    }
+
+
+def _strip_code_fence(latex_content: str) -> str:
     if "```" in latex_content:
         parts = latex_content.split("```")
         if len(parts) >= 3:
             block = parts[1]
             latex_content = block.replace("latex", "").strip()
+    return latex_content
+
+
+def _cache_parts(extended_cv: str, job_description: str, structured: bool) -> dict:
+    """LLM cache key parts of a tailoring request."""
+    if structured:
+        return {"model": MODEL, "system": STRUCTURED_PROMPT, "cv": extended_cv, "job": job_description,
+                "schema": CVContent.model_json_schema()}
+    return {"model": MODEL, "system": SYSTEM_PROMPT, "cv": extended_cv, "job": job_description}
+
+
+def _generate_full_latex(extended_cv: str, job_description: str) -> str:
+    def generate():
+        start = time.perf_counter()
+        with tracing.stage("openai.responses", model=MODEL, structured=False):
+            response = _openai_client().responses.create(**_full_request(extended_cv, job_description))
+            _report_usage(response, start)
+        return response.output_text
+
+    latex_content = cached(generate, **_cache_parts(extended_cv, job_description, structured=False))
+    return _strip_code_fence(latex_content)
+
+
+class CVContentRefusedError(RuntimeError):
+    """The model returned no CVContent for a structured request, e.g. because it refused."""
+
+
+def _parsed_content(response) -> dict:
+    if response.output_parsed is None:
+        refusals = [
+            part.refusal
+            for item in getattr(response, "output", None) or []
+            for part in getattr(item, "content", None) or []
+            if getattr(part, "type", None) == "refusal"
+        ]
+        reason = refusals[0] if refusals else "no parsed output"
+        raise CVContentRefusedError(f"{MODEL} returned no CV content: {reason}")
+    return response.output_parsed.model_dump()
+
+
+def _generate_structured_latex(extended_cv: str, job_description: str) -> str:
+    def generate():
+        start = time.perf_counter()
+        with tracing.stage("openai.responses", model=MODEL, structured=True):
+            response = _openai_client().responses.parse(**_structured_request(extended_cv, job_description))
+            _report_usage(response, start)
+        return _parsed_content(response)
+
+    content = cached(generate, **_cache_parts(extended_cv, job_description, structured=True))
+    return render_cv(CVContent.model_validate(content))
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: bursts of up to `burst` requests, refilled at `rate` requests per second.
+    Waiters are served in arrival order.
+    """
 
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _AsyncPool:
+    """The shared AsyncOpenAI client, in-flight limit and rate limiter of one event loop."""
+
+    def __init__(self):
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not set.")
+        # retries are ours (jittered, rate limited), so the SDK's own are off
+        self.client = AsyncOpenAI(
+            api_key=api_key, max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=MAX_IN_FLIGHT, max_keepalive_connections=MAX_IN_FLIGHT)
+            ),
+        )
+        self.in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self.bucket = TokenBucket(REQUESTS_PER_MINUTE / 60, burst=MAX_IN_FLIGHT)
+        self.retries = 0
+
+
+# asyncio primitives and httpx connections belong to one event loop, so there is one pool per loop
+_async_pools = weakref.WeakKeyDictionary()
+
+
+def _async_pool() -> _AsyncPool:
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = _async_pools[loop] = _AsyncPool()
+    return pool
+
+
+async def close_async_client():
+    """Close the running loop's AsyncOpenAI client and its pooled connections."""
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.client.close()
+
+
+def _backoff_s(attempt: int, error: Exception) -> float:
+    # full jitter, but never sooner than the server's Retry-After
+    delay = random.uniform(0, min(RETRY_MAX_S, RETRY_BASE_S * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+async def _request_with_retries(send):
+    """
+    Await send(client) under the rate limiter and the in-flight limit,
+    retrying rate limits, server errors and dropped connections with backoff.
+    """
+    pool = _async_pool()
+    for attempt in range(MAX_RETRIES + 1):
+        await pool.bucket.acquire()
+        async with pool.in_flight:
+            try:
+                return await send(pool.client)
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                error = e
+        pool.retries += 1
+        delay = _backoff_s(attempt, error)
+        print(f"{MODEL}: {type(error).__name__}, retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+        tracing.record(**{"openai.retries": 1})
+        await asyncio.sleep(delay)
+
+
+async def _generate_full_latex_async(extended_cv: str, job_description: str) -> str:
+    async def generate():
+        start = time.perf_counter()
+        with tracing.stage("openai.responses", model=MODEL, structured=False):
+            response = await _request_with_retries(
+                lambda client: client.responses.create(**_full_request(extended_cv, job_description))
+            )
+            _report_usage(response, start)
+        return response.output_text
+
+    latex_content = await cached_async(generate, **_cache_parts(extended_cv, job_description, structured=False))
+    return _strip_code_fence(latex_content)
+
+
+async def _generate_structured_latex_async(extended_cv: str, job_description: str) -> str:
+    async def generate():
+        start = time.perf_counter()
+        with tracing.stage("openai.responses", model=MODEL, structured=True):
+            response = await _request_with_retries(
+                lambda client: client.responses.parse(**_structured_request(extended_cv, job_description))
+            )
+            _report_usage(response, start)
+        return _parsed_content(response)
+
+    content = await cached_async(generate, **_cache_parts(extended_cv, job_description, structured=True))
+    return render_cv(CVContent.model_validate(content))
+
+
+def set_structured_output(enabled: bool):
+    global STRUCTURED_OUTPUT
+    STRUCTURED_OUTPUT = enabled
+
+
+def _compile_cv(latex_content: str, output_dir: str, filename: str) -> str:
     out_dir = Path(output_dir).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -277,11 +535,103 @@ def create_optimised_cv(extended_cv: str, job_description: str, output_dir: str,
 
     tex_file.write_text(latex_content, encoding="utf-8")
 
-    cmd = ["pdflatex", "-interaction=nonstopmode", "-output-directory", str(out_dir), str(tex_file)]
-    subprocess.run(cmd, capture_output=True, text=True, cwd=str(out_dir))
-    subprocess.run(cmd, capture_output=True, text=True, cwd=str(out_dir))
-
-    if not pdf_file.exists():
-        raise RuntimeError("PDF not generated.")
+    with tracing.stage("latex.compile") as span:
+        result = compile_tex(tex_file)
+        span.set_attribute("latex.passes", result.passes)
+        span.set_attribute("latex.precompiled", result.used_format)
+        span.set_attribute("latex.timed_out", result.timed_out)
+    if not result.ok:
+        raise LatexCompileError(tex_file, result)
+    print(f"Compiled {pdf_file.name} in {result.seconds:.2f}s "
+          f"({result.passes} pass{'es' if result.passes > 1 else ''}, "
+          f"{'precompiled' if result.used_format else 'full'} preamble)")
 
     return str(pdf_file)
+
+
+def create_optimised_cv(extended_cv: str, job_description: str, output_dir: str, filename: str,
+                        structured: bool | None = None) -> str:
+    """
+    Creates an optimised one-page CV in LaTeX and outputs .tex and .pdf in output_dir.
+
+    Args:
+        extended_cv (str): extended CV text or path
+        job_description (str): job description text or path
+        output_dir (str): folder to write .tex and .pdf
+        filename (str): filename of .text and .pdf files
+        structured (bool): have the model return CVContent sections that are rendered into
+            the fixed template, instead of a whole LaTeX document (default: STRUCTURED_OUTPUT)
+
+    Returns:
+        str: absolute path to generated PDF
+    """
+    if structured is None:
+        structured = STRUCTURED_OUTPUT
+
+    if structured:
+        latex_content = _generate_structured_latex(extended_cv, job_description)
+    else:
+        latex_content = _generate_full_latex(extended_cv, job_description)
+
+    try:
+        return _compile_cv(latex_content, output_dir, filename)
+    except LatexCompileError:
+        # a reply that does not compile must not be served from the cache on the next run
+        forget(**_cache_parts(extended_cv, job_description, structured))
+        raise
+
+
+async def create_optimised_cv_async(extended_cv: str, job_description: str, output_dir: str, filename: str,
+                                    structured: bool | None = None) -> str:
+    """
+    Async create_optimised_cv: the GPT-5 request goes through the running loop's shared
+    client, rate limiter and retries, and pdflatex runs in a worker thread.
+
+    Args and return value are the same as create_optimised_cv.
+    """
+    if structured is None:
+        structured = STRUCTURED_OUTPUT
+
+    if structured:
+        latex_content = await _generate_structured_latex_async(extended_cv, job_description)
+    else:
+        latex_content = await _generate_full_latex_async(extended_cv, job_description)
+
+    try:
+        return await asyncio.to_thread(_compile_cv, latex_content, output_dir, filename)
+    except LatexCompileError:
+        forget(**_cache_parts(extended_cv, job_description, structured))
+        raise
+
+
+def create_optimised_cvs(extended_cv: str, jobs: list[JobDetails], output_dir: str,
+                         structured: bool | None = None) -> list:
+    """
+    Tailor a CV for every job at once, with up to MAX_IN_FLIGHT GPT-5 requests in flight.
+
+    Args:
+        extended_cv (str): extended CV text
+        jobs (list[JobDetails]): jobs to tailor for; files are named after title, company and link
+        output_dir (str): folder to write the .tex and .pdf files
+        structured (bool): as for create_optimised_cv
+
+    Returns:
+        list: for each job in order, the PDF path or the exception its CV failed with
+    """
+    # jobs compile concurrently, so each needs its own files, even the same posting listed twice
+    filenames = [make_filename(job.title, job.company, job.link) for job in jobs]
+    filenames = [f"{name}_{i}" if filenames.count(name) > 1 else name for i, name in enumerate(filenames)]
+
+    async def tailor_all():
+        try:
+            return await asyncio.gather(
+                *(
+                    create_optimised_cv_async(extended_cv, job.description or "", output_dir, filename, structured)
+                    for job, filename in zip(jobs, filenames)
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            await close_async_client()
+
+    return asyncio.run(tailor_all())
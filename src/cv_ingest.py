@@ -0,0 +1,159 @@
+"""
+Text extraction for uploaded CVs (PDF, DOCX or plain text).
+
+Documents are read page by page as a stream: pypdf parses one PDF page at a time
+and DOCX files are parsed incrementally from the zip archive with iterparse, so a
+long CV is never held in memory as a whole parsed document. Each page is
+normalised and the final text is cached on disk keyed by the file's SHA-256, so
+re-uploading the same CV skips parsing entirely.
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+CACHE_DIR = os.getenv(
+    "CV_TEXT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "cv_text"),
+)
+# bump when extraction or normalisation changes so cached text is rebuilt
+EXTRACTOR_VERSION = 1
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class CVIngestError(ValueError):
+    pass
+
+
+def is_supported(path: str) -> bool:
+    return Path(path).suffix.lower() in SUPPORTED_EXTENSIONS
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pdf_pages(path: str):
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    try:
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+    except PdfReadError as e:
+        raise CVIngestError(f"{Path(path).name} is not a readable PDF: {e}") from e
+
+
+def _docx_pages(path: str):
+    """Yield the text of each page, split at explicit and last-rendered page breaks."""
+    page, paragraph = [], []
+    # open elements from the root down, so a finished paragraph can be detached from its parent
+    open_elems = []
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+            for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    open_elems.append(elem)
+                    if tag == W + "lastRenderedPageBreak" or (tag == W + "br" and elem.get(W + "type") == "page"):
+                        page.append("".join(paragraph))
+                        paragraph = []
+                        yield "\n".join(page)
+                        page = []
+                    continue
+
+                open_elems.pop()
+                if tag == W + "t":
+                    paragraph.append(elem.text or "")
+                elif tag == W + "tab":
+                    paragraph.append("\t")
+                elif tag == W + "br" and elem.get(W + "type") != "page":
+                    paragraph.append("\n")
+                elif tag == W + "p":
+                    page.append("".join(paragraph))
+                    paragraph = []
+                    # drop the parsed paragraph, and the body's reference to it, so memory stays flat
+                    elem.clear()
+                    if open_elems:
+                        open_elems[-1].remove(elem)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise CVIngestError(f"{Path(path).name} is not a readable DOCX file: {e}") from e
+
+    page.append("".join(paragraph))
+    yield "\n".join(page)
+
+
+def _text_pages(path: str):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from f.read().split("\f")
+
+
+def iter_pages(path: str):
+    """Yield the raw text of each page of the CV at path."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        return _pdf_pages(path)
+    if suffix == ".docx":
+        return _docx_pages(path)
+    if suffix == ".txt":
+        return _text_pages(path)
+    raise CVIngestError(f"Unsupported CV format '{suffix}', expected one of {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+def normalize(text: str) -> str:
+    """
+    Clean extracted text: NFKC (ligatures, full-width characters), no control
+    characters, words hyphenated across line breaks rejoined, runs of spaces
+    collapsed and at most one blank line in a row.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r"[\x00-\x08\x0b-\x1f\x7f]", "", text)
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    lines = [line.strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def read_cv(path: str) -> str:
+    """
+    Return the normalised text of the CV at path, extracting it on first sight of the file.
+
+    Raises:
+        CVIngestError: if the format is not supported, the file is corrupt or no text
+            could be extracted (e.g. a scanned PDF without a text layer)
+    """
+    if not is_supported(path):
+        raise CVIngestError(
+            f"Unsupported CV format '{Path(path).suffix}', expected one of {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+    cache_file = Path(CACHE_DIR) / f"{file_sha256(path)}-v{EXTRACTOR_VERSION}.txt"
+    if cache_file.exists():
+        return cache_file.read_text(encoding="utf-8")
+
+    pages, number = [], 0
+    for number, raw in enumerate(iter_pages(path), start=1):
+        text = normalize(raw)
+        if text:
+            pages.append(text)
+    text = "\n\n".join(pages)
+    if not text:
+        raise CVIngestError(f"No text could be extracted from {path}")
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, cache_file)
+    print(f"Extracted {len(text)} characters from {number} page(s) of {Path(path).name}")
+    return text
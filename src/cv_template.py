@@ -0,0 +1,83 @@
+"""
+Renders a CVContent model into the fixed LaTeX resume template (templates/resume.tex.j2).
+
+The template uses LaTeX-friendly Jinja delimiters, \BLOCK{...} for statements and
+\VAR{...} for values, and every value is LaTeX-escaped on output.
+"""
+
+import re
+from pathlib import Path
+
+import jinja2
+
+from models import CVContent
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+TEMPLATE_NAME = "resume.tex.j2"
+
+LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+LATEX_SPECIALS_PATTERN = re.compile("|".join(re.escape(c) for c in LATEX_SPECIALS))
+
+
+class LatexSafe(str):
+    """A string that is already valid LaTeX and must not be escaped again."""
+
+
+def latex_escape(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, LatexSafe):
+        return value
+    return LATEX_SPECIALS_PATTERN.sub(lambda m: LATEX_SPECIALS[m.group(0)], str(value))
+
+
+def latex_url(value: str) -> LatexSafe:
+    # inside \href only % and # need escaping
+    return LatexSafe(str(value).replace("%", r"\%").replace("#", r"\#"))
+
+
+_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(str(TEMPLATE_DIR)),
+    block_start_string=r"\BLOCK{",
+    block_end_string="}",
+    variable_start_string=r"\VAR{",
+    variable_end_string="}",
+    comment_start_string=r"\#{",
+    comment_end_string="}",
+    trim_blocks=True,
+    lstrip_blocks=True,
+    autoescape=False,
+    finalize=latex_escape,
+    undefined=jinja2.StrictUndefined,
+)
+_env.filters["url"] = latex_url
+
+
+def _contacts(cv: CVContent) -> list[dict]:
+    header = cv.header
+    with_scheme = lambda url: url if url.startswith("http") else f"https://{url}"
+    contacts = []
+    if header.phone:
+        contacts.append({"text": header.phone, "url": None})
+    if header.email:
+        contacts.append({"text": header.email, "url": f"mailto:{header.email}"})
+    for url in (header.linkedin, header.github):
+        if url:
+            contacts.append({"text": re.sub(r"^https?://(www\.)?", "", url), "url": with_scheme(url)})
+    return contacts
+
+
+def render_cv(cv: CVContent) -> str:
+    """Fill the resume template with cv and return the complete .tex document."""
+    return _env.get_template(TEMPLATE_NAME).render(cv=cv, contacts=_contacts(cv))
@@ -0,0 +1,340 @@
+"""
+Persistent job queue for uploaded CVs, with a fixed pool of workers and a status API.
+
+auto_apply.py enqueues one job per upload; this service runs them with a fixed
+number of worker threads, so concurrent uploads wait their turn instead of each
+loading a model and starting a browser. Admission control rejects new jobs once
+MAX_PENDING jobs are queued or running.
+
+Run the service from src/:
+    python job_queue.py --workers 1 --port 8766
+
+Endpoints:
+    POST /jobs       {"cv_file": ...}  -> 202 {"job_id": ...}, or 429 when the queue is full
+    GET  /jobs/<id>                    -> status, stage, progress, result or error of one job
+    GET  /jobs                         -> most recent jobs
+    GET  /health                       -> queue counts and worker count
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import fire
+
+# absolute, because auto_apply.py (project root) and the service (src/) run from different directories
+QUEUE_PATH = os.getenv(
+    "JOB_QUEUE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "job_queue.sqlite"),
+)
+MAX_PENDING = int(os.getenv("JOB_QUEUE_MAX_PENDING", 20))
+DEFAULT_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+POLL_INTERVAL_S = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FIELDS = (
+    "id", "cv_file", "status", "stage", "progress_done", "progress_total", "message",
+    "result", "error", "created_at", "started_at", "finished_at",
+)
+
+
+class QueueFullError(RuntimeError):
+    def __init__(self, pending: int, limit: int):
+        self.pending = pending
+        self.limit = limit
+        super().__init__(f"Job queue is full ({pending}/{limit} jobs queued or running)")
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared by the enqueuing process and the service.
+
+    Admission and claiming run in IMMEDIATE transactions, so several processes
+    can enqueue and claim concurrently without double-booking a job.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH, max_pending: int = MAX_PENDING):
+        self.path = path
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " cv_file TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " stage TEXT,"
+                " progress_done INTEGER NOT NULL DEFAULT 0,"
+                " progress_total INTEGER NOT NULL DEFAULT 0,"
+                " message TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+        return self._conn
+
+    def enqueue(self, cv_file: str) -> str:
+        """
+        Add a job for cv_file and return its id.
+
+        Raises:
+            QueueFullError: if max_pending jobs are already queued or running
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (pending,) = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                ).fetchone()
+                if pending >= self.max_pending:
+                    raise QueueFullError(pending, self.max_pending)
+                conn.execute(
+                    "INSERT INTO jobs (id, cv_file, status, stage, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, os.path.abspath(cv_file), QUEUED, "waiting for a worker", time.time()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self) -> dict | None:
+        """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, stage = ?, started_at = ? WHERE id = ?",
+                        (RUNNING, "starting", time.time(), row[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row else None
+
+    def update(self, job_id: str, stage: str | None = None, done: int | None = None,
+               total: int | None = None, message: str | None = None):
+        """Record progress of a running job; fields left as None keep their value."""
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET stage = COALESCE(?, stage), progress_done = COALESCE(?, progress_done),"
+                " progress_total = COALESCE(?, progress_total), message = COALESCE(?, message)"
+                " WHERE id = ?",
+                (stage, done, total, message, job_id),
+            )
+
+    def finish(self, job_id: str, result: dict):
+        self._close(job_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str):
+        self._close(job_id, FAILED, error=error)
+
+    def _close(self, job_id: str, status: str, result: str | None = None, error: str | None = None):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, status, result, error, time.time(), job_id),
+            )
+
+    def requeue_running(self) -> int:
+        """Put jobs left running by a service that died back in the queue; returns how many."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET status = ?, stage = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, "waiting for a worker", RUNNING),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def recent(self, limit: int = 50) -> list[dict]:
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(FIELDS)} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    def position(self, job_id: str) -> int | None:
+        """1-based place of a queued job in the queue, None if it is not queued."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at <="
+                " (SELECT created_at FROM jobs WHERE id = ? AND status = ?)",
+                (QUEUED, job_id, QUEUED),
+            ).fetchone()
+        return row[0] or None
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        counts["max_pending"] = self.max_pending
+        return counts
+
+    @staticmethod
+    def _as_dict(row) -> dict:
+        job = dict(zip(FIELDS, row))
+        if job["result"]:
+            job["result"] = json.loads(job["result"])
+        return job
+
+
+def run_job(queue: JobQueue, job: dict) -> dict:
+    """Extract job titles from the job's CV and search and apply for each of them."""
+    from apply_agent import process_titles_parallel
+    from cv_ingest import read_cv
+    from llm_client import extract_job_titles
+
+    job_id = job["id"]
+    queue.update(job_id, stage="reading CV")
+    cv_text = read_cv(job["cv_file"])
+
+    queue.update(job_id, stage="extracting job titles")
+    titles = extract_job_titles(cv_text)
+    queue.update(job_id, stage="applying", done=0, total=len(titles), message=f"target roles: {titles}")
+
+    def tracked(titles):
+        for i, title in enumerate(titles):
+            queue.update(job_id, done=i, message=f"searching for '{title}'")
+            yield title
+
+    results = process_titles_parallel(tracked(titles), cv_text, workers=1, headless=True)
+    queue.update(job_id, done=len(titles))
+    return {"titles": titles, "results": results}
+
+
+class JobService:
+    """Fixed pool of worker threads draining the queue."""
+
+    def __init__(self, queue: JobQueue, workers: int = DEFAULT_WORKERS, handler=run_job):
+        self.queue = queue
+        self.workers = workers
+        self.handler = handler
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"Re-queued {requeued} job(s) left running by a previous service")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._stop.wait(POLL_INTERVAL_S)
+                continue
+            print(f"[{threading.current_thread().name}] running job {job['id']} for {job['cv_file']}")
+            try:
+                self.queue.finish(job["id"], self.handler(self.queue, job))
+            except Exception as e:
+                print(f"Job {job['id']} failed: {e}")
+                self.queue.fail(job["id"], str(e))
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    queue: JobQueue = None
+    workers: int = 0
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["health"]:
+            return self._send(200, {"status": "ok", "workers": self.workers, **self.queue.stats()})
+        if parts == ["jobs"]:
+            return self._send(200, {"jobs": self.queue.recent()})
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.queue.get(parts[1])
+            if job is None:
+                return self._send(404, {"error": "unknown job"})
+            job["queue_position"] = self.queue.position(job["id"]) if job["status"] == QUEUED else None
+            return self._send(200, job)
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            cv_file = json.loads(self.rfile.read(length) or b"{}")["cv_file"]
+        except (ValueError, KeyError):
+            return self._send(400, {"error": "expected JSON body with cv_file"})
+        try:
+            job_id = self.queue.enqueue(cv_file)
+        except QueueFullError as e:
+            return self._send(429, {"error": str(e)})
+        self._send(202, {"job_id": job_id, "status": QUEUED})
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(workers: int = DEFAULT_WORKERS, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+         path: str = QUEUE_PATH, max_pending: int = MAX_PENDING):
+    queue = JobQueue(path, max_pending)
+    service = JobService(queue, workers)
+    service.start()
+
+    StatusHandler.queue = queue
+    StatusHandler.workers = workers
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    print(f"Job queue service with {workers} worker(s) listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,358 @@
+"""
+Grammar-constrained JSON decoding for the local model.
+
+A pydantic model (or any type pydantic can describe, e.g. list[str]) is turned
+into a character-level JSON state machine. JsonSchemaLogitsProcessor then masks
+every token that would take the output off a valid document, so the generated
+text always parses and validates on the first attempt.
+
+Only the top_k highest-scoring tokens are checked at each step (falling back to
+the rest of the vocabulary in score order if none of them fit), which keeps the
+per-token overhead small.
+
+Supported schema features: objects (keys emitted in schema order), arrays with
+minItems/maxItems, strings, numbers, integers, booleans, null, enum/const and
+anyOf whose options start with different characters (e.g. `str | None`).
+"""
+
+import json
+import re
+import threading
+
+NUMBER_PATTERN = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+INTEGER_PATTERN = re.compile(r"-?(?:0|[1-9]\d*)")
+WHITESPACE = " \t\n\r"
+HEX_DIGITS = "0123456789abcdefABCDEF"
+MAX_WHITESPACE = 16
+TOP_K = 64
+
+_vocab_lock = threading.Lock()
+_vocab_text = {}
+
+
+def schema_for(model) -> dict:
+    """JSON schema for a pydantic model class or a plain type such as list[str]."""
+    from pydantic import BaseModel, TypeAdapter
+
+    if isinstance(model, type) and issubclass(model, BaseModel):
+        return model.model_json_schema()
+    return TypeAdapter(model).json_schema()
+
+
+def _resolve(schema: dict, root: dict) -> dict:
+    while "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        schema = root.get("$defs", {})[name]
+    return schema
+
+
+def compile_schema(schema: dict, root: dict | None = None):
+    """
+    Compile a JSON schema into nested node tuples used by JsonStateMachine:
+    ("object", ((key, node), ...)), ("array", item, min, max), ("string",),
+    ("number", integer), ("literal", text) and ("union", (node, ...)).
+    """
+    root = root or schema
+    schema = _resolve(schema, root)
+
+    if "const" in schema:
+        return ("literal", _json_text(schema["const"]))
+    if "enum" in schema:
+        return ("union", tuple(("literal", _json_text(v)) for v in schema["enum"]))
+    if "anyOf" in schema or "oneOf" in schema:
+        return ("union", tuple(compile_schema(s, root) for s in schema.get("anyOf") or schema["oneOf"]))
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        return ("union", tuple(compile_schema({**schema, "type": k}, root) for k in kind))
+    if kind == "object":
+        fields = tuple((name, compile_schema(prop, root)) for name, prop in schema.get("properties", {}).items())
+        return ("object", fields)
+    if kind == "array":
+        return ("array", compile_schema(schema.get("items", {"type": "string"}), root),
+                schema.get("minItems", 0), schema.get("maxItems"))
+    if kind == "string":
+        return ("string",)
+    if kind in ("number", "integer"):
+        return ("number", kind == "integer")
+    if kind == "boolean":
+        return ("union", (("literal", "true"), ("literal", "false")))
+    if kind == "null":
+        return ("literal", "null")
+    raise ValueError(f"Unsupported JSON schema for constrained decoding: {schema}")
+
+
+def _json_text(value) -> str:
+    return json.dumps(value)
+
+
+class JsonStateMachine:
+    """
+    Incremental JSON validator for a compiled schema.
+
+    States are immutable (stack, whitespace_run) tuples, so checking a candidate
+    token never disturbs the current state. An empty stack means the document
+    is complete.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    def initial(self):
+        return ((("value", self.node),), 0)
+
+    @staticmethod
+    def is_complete(state) -> bool:
+        return not state[0]
+
+    def advance(self, state, text: str):
+        """Return the state after text, or None if text cannot continue a valid document."""
+        stack, ws = state
+        for char in text:
+            result = self._step(stack, ws, char)
+            if result is None:
+                return None
+            stack, ws = result
+        return stack, ws
+
+    def _step(self, stack, ws, char):
+        if not stack:
+            # trailing whitespace after the document is harmless; anything else is not
+            return (stack, ws + 1) if char in WHITESPACE and ws < MAX_WHITESPACE else None
+
+        frame = stack[-1]
+        rest = stack[:-1]
+        kind = frame[0]
+
+        if kind == "value":
+            if char in WHITESPACE:
+                return (stack, ws + 1) if ws < MAX_WHITESPACE else None
+            return self._start_value(rest, frame[1], char)
+
+        if kind == "string":
+            escaped = frame[1]
+            if isinstance(escaped, tuple):
+                # ("unicode", n): n hex digits of a \uXXXX escape still to come
+                if char not in HEX_DIGITS:
+                    return None
+                left = escaped[1] - 1
+                return (rest + (("string", ("unicode", left) if left else False),), 0)
+            if escaped:
+                if char == "u":
+                    return (rest + (("string", ("unicode", 4)),), 0)
+                return (rest + (("string", False),), 0) if char in '"\\/bfnrt' else None
+            if char == "\\":
+                return (rest + (("string", True),), 0)
+            if char == '"':
+                return rest, 0
+            return (stack, 0) if char >= " " else None
+
+        if kind == "literal":
+            text, pos = frame[1], frame[2]
+            if char != text[pos]:
+                return None
+            return (rest, 0) if pos + 1 == len(text) else (rest + (("literal", text, pos + 1),), 0)
+
+        if kind == "number":
+            integer, text = frame[1], frame[2]
+            pattern = INTEGER_PATTERN if integer else NUMBER_PATTERN
+            candidate = text + char
+            if pattern.fullmatch(candidate) or pattern.fullmatch(candidate + "0"):
+                return (rest + (("number", integer, candidate),), 0)
+            if not pattern.fullmatch(text):
+                return None
+            # the number ended; the character belongs to the enclosing container
+            return self._step(rest, 0, char)
+
+        if kind == "array":
+            _, item, min_items, max_items, phase, count = frame
+            if char in WHITESPACE:
+                return (stack, ws + 1) if ws < MAX_WHITESPACE else None
+            if phase == "first":
+                if char == "]" and min_items == 0:
+                    return rest, 0
+                if max_items == 0:
+                    return None
+                after = rest + (("array", item, min_items, max_items, "after", 1),)
+                return self._start_value(after, item, char)
+            if phase == "after":
+                if char == "]" and count >= min_items:
+                    return rest, 0
+                if char == "," and (max_items is None or count < max_items):
+                    return (rest + (("array", item, min_items, max_items, "next", count),), 0)
+                return None
+            after = rest + (("array", item, min_items, max_items, "after", count + 1),)
+            return self._start_value(after, item, char)
+
+        if kind == "object":
+            _, fields, index, phase, pos = frame
+            if phase == "key":
+                key = _json_text(fields[index][0])
+                if pos == 0 and char in WHITESPACE:
+                    return (stack, ws + 1) if ws < MAX_WHITESPACE else None
+                if char != key[pos]:
+                    return None
+                if pos + 1 == len(key):
+                    return (rest + (("object", fields, index, "colon", 0),), 0)
+                return (rest + (("object", fields, index, "key", pos + 1),), 0)
+            if char in WHITESPACE:
+                return (stack, ws + 1) if ws < MAX_WHITESPACE else None
+            if phase == "colon":
+                if char != ":":
+                    return None
+                after = rest + (("object", fields, index, "after", 0),)
+                return after + (("value", fields[index][1]),), 0
+            if index + 1 < len(fields):
+                return (rest + (("object", fields, index + 1, "key", 0),), 0) if char == "," else None
+            return (rest, 0) if char == "}" else None
+
+        raise AssertionError(f"unknown frame {frame!r}")
+
+    def _start_value(self, stack, node, char):
+        kind = node[0]
+        if kind == "union":
+            for option in node[1]:
+                result = self._start_value(stack, option, char)
+                if result is not None:
+                    return result
+            return None
+        if kind == "string":
+            return (stack + (("string", False),), 0) if char == '"' else None
+        if kind == "literal":
+            return self._step(stack + (("literal", node[1], 0),), 0, char)
+        if kind == "number":
+            return self._step(stack + (("number", node[1], ""),), 0, char)
+        if kind == "array":
+            return (stack + (("array", node[1], node[2], node[3], "first", 0),), 0) if char == "[" else None
+        if kind == "object":
+            if char != "{":
+                return None
+            if not node[1]:
+                return (stack + (("object", node[1], -1, "after", 0),), 0)
+            return (stack + (("object", node[1], 0, "key", 0),), 0)
+        raise AssertionError(f"unknown node {node!r}")
+
+
+def _token_texts(tokenizer) -> list[str | None]:
+    """Decoded text of every token id (None for special tokens), computed once per tokenizer."""
+    key = id(tokenizer)
+    texts = _vocab_text.get(key)
+    if texts is not None:
+        return texts
+    with _vocab_lock:
+        if key not in _vocab_text:
+            special = set(tokenizer.all_special_ids)
+            _vocab_text[key] = [
+                None if i in special else tokenizer.decode([i]) or None
+                for i in range(len(tokenizer))
+            ]
+        return _vocab_text[key]
+
+
+def make_logits_processor(tokenizer, model, eos_token_id=None, top_k: int = TOP_K):
+    """
+    Build a LogitsProcessorList constraining generation to JSON valid for model.
+
+    Args:
+        tokenizer: tokenizer of the generating model
+        model: pydantic model class or type (e.g. list[str]) the output must validate against
+        eos_token_id (int | list[int]): ids allowed once the document is complete;
+            defaults to the tokenizer's eos token
+        top_k (int): number of highest-scoring tokens checked per step before
+            falling back to the rest of the vocabulary
+
+    Returns:
+        transformers.LogitsProcessorList: a fresh processor; use one per generate call (its
+        state is reset if it sees a new batch anyway)
+    """
+    from transformers import LogitsProcessorList
+
+    processor_cls = _processor_class()
+    machine = JsonStateMachine(compile_schema(schema_for(model)))
+    if eos_token_id is None:
+        eos_token_id = tokenizer.eos_token_id
+    eos_ids = [eos_token_id] if isinstance(eos_token_id, int) else list(eos_token_id)
+    return LogitsProcessorList([processor_cls(machine, _token_texts(tokenizer), eos_ids, top_k)])
+
+
+_processor_cls = None
+
+
+def _processor_class():
+    # defined lazily so importing this module does not import torch/transformers
+    global _processor_cls
+    if _processor_cls is not None:
+        return _processor_cls
+
+    import torch
+    from transformers import LogitsProcessor
+
+    class JsonSchemaLogitsProcessor(LogitsProcessor):
+        def __init__(self, machine: JsonStateMachine, token_texts: list, eos_ids: list[int], top_k: int):
+            self.machine = machine
+            self.token_texts = token_texts
+            self.eos_ids = eos_ids
+            self.top_k = top_k
+            self.states = None
+            self.prompt_length = None
+            self.length = None
+            self.checked = 0
+
+        def _update_states(self, input_ids):
+            batch, length = input_ids.shape
+            # a new generate call (new rows or a new prompt) starts every row from the beginning
+            if self.states is None or batch != len(self.states) or length != self.length + 1:
+                self.prompt_length = length
+                self.length = length
+                self.states = [self.machine.initial() for _ in range(batch)]
+                return
+            self.length = length
+            for row, token_id in enumerate(input_ids[:, -1].tolist()):
+                state = self.states[row]
+                if state is None or self.machine.is_complete(state):
+                    continue
+                self.states[row] = self.machine.advance(state, self.token_texts[token_id] or "")
+
+        def _allowed(self, state, row_scores) -> list[int]:
+            if self.machine.is_complete(state):
+                return self.eos_ids
+
+            vocab = len(self.token_texts)
+            k = min(self.top_k, row_scores.shape[-1])
+            ranked = torch.topk(row_scores, k).indices.tolist()
+            allowed = self._check(state, ranked, vocab)
+            if allowed:
+                return allowed
+
+            # nothing plausible fits: walk the rest of the vocabulary by score until something does
+            order = torch.argsort(row_scores, descending=True).tolist()
+            for start in range(k, len(order), 4096):
+                allowed = self._check(state, order[start:start + 4096], vocab)
+                if allowed:
+                    return allowed
+            return self.eos_ids
+
+        def _check(self, state, token_ids, vocab) -> list[int]:
+            allowed = []
+            for token_id in token_ids:
+                if token_id >= vocab:
+                    continue
+                self.checked += 1
+                text = self.token_texts[token_id]
+                if text and self.machine.advance(state, text) is not None:
+                    allowed.append(token_id)
+            return allowed
+
+        def __call__(self, input_ids, scores):
+            self._update_states(input_ids)
+            mask = torch.full_like(scores, float("-inf"))
+            for row, state in enumerate(self.states):
+                if state is None:
+                    # cannot happen for tokens we allowed; keep the row unconstrained rather than crash
+                    mask[row] = 0
+                    continue
+                mask[row, self._allowed(state, scores[row])] = 0
+            return scores + mask
+
+    _processor_cls = JsonSchemaLogitsProcessor
+    return _processor_cls
@@ -0,0 +1,251 @@
+"""
+pdflatex compile backend for generated CVs.
+
+The preamble of a CV (everything before \\begin{document}) is precompiled once
+into a format file with mylatexformat and reused for every CV that shares it,
+so each compile only typesets the body. A second pass is only run when the log
+asks for one.
+
+Every pdflatex run has a wall-clock timeout and a memory limit, so generated
+LaTeX that loops is killed instead of hanging the job run. compile_many builds
+many CVs concurrently.
+"""
+
+import hashlib
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+FORMAT_DIR = os.getenv("LATEX_FORMAT_DIR", ".cache/latex_formats")
+MAX_PASSES = 3
+COMPILE_TIMEOUT_S = float(os.getenv("LATEX_TIMEOUT_S", 60))
+MEMORY_LIMIT_MB = int(os.getenv("LATEX_MEMORY_LIMIT_MB", 1024))
+
+RERUN_PATTERN = re.compile(r"Rerun to get|Label\(s\) may have changed|Rerun LaTeX")
+
+_format_lock = threading.Lock()
+# formats whose build failed in this process; they are not retried until the next run
+_failed_formats = set()
+
+
+@dataclass
+class LatexError:
+    message: str
+    line: int | None
+    context: str
+
+
+@dataclass
+class CompileResult:
+    pdf_path: Path
+    passes: int
+    seconds: float
+    used_format: bool
+    timed_out: bool = False
+    errors: list[LatexError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.pdf_path.exists()
+
+
+class LatexCompileError(RuntimeError):
+    def __init__(self, tex_file: Path, result: CompileResult):
+        self.tex_file = tex_file
+        self.result = result
+        if result.timed_out:
+            reason = f"timed out after {result.seconds:.0f}s"
+        elif result.errors:
+            first = result.errors[0]
+            reason = f"{first.message} (line {first.line})" if first.line else first.message
+        else:
+            reason = "no PDF produced"
+        super().__init__(f"PDF not generated for {Path(tex_file).name}: {reason}")
+
+
+def parse_log_errors(log_file: Path) -> list[LatexError]:
+    """Collect '! ...' error messages from a pdflatex log with their 'l.<n>' source line."""
+    if not log_file.exists():
+        return []
+    lines = log_file.read_text(encoding="utf-8", errors="replace").splitlines()
+    errors = []
+    for i, text in enumerate(lines):
+        if not text.startswith("! "):
+            continue
+        line_no, context = None, ""
+        for follow in lines[i + 1:i + 12]:
+            match = re.match(r"l\.(\d+) ?(.*)", follow)
+            if match:
+                line_no, context = int(match.group(1)), match.group(2).strip()
+                break
+        errors.append(LatexError(message=text[2:].strip(), line=line_no, context=context))
+    return errors
+
+
+def _run_pdflatex(cmd: list[str], cwd: Path, env: dict | None, timeout: float, memory_limit_mb: int) -> bool:
+    """Run one pdflatex pass; returns False if it had to be killed for exceeding timeout."""
+    if memory_limit_mb:
+        # set the limit in a shell that then execs pdflatex; preexec_fn is unsafe with threads
+        cmd = ["sh", "-c", f'ulimit -v {memory_limit_mb * 1024} 2>/dev/null; exec "$0" "$@"', *cmd]
+    process = subprocess.Popen(
+        cmd,
+        cwd=str(cwd),
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        process.wait(timeout=timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        # kill the whole session so helpers spawned by pdflatex (mktextfm etc.) die too
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        return False
+
+
+def split_preamble(tex: str) -> tuple[str, str]:
+    marker = tex.find("\\begin{document}")
+    if marker == -1:
+        return "", tex
+    return tex[:marker], tex[marker:]
+
+
+def ensure_format(preamble: str, format_dir: str = FORMAT_DIR) -> str | None:
+    """
+    Return the name of a format file with preamble precompiled, building it if needed.
+
+    Returns None if the format could not be built (e.g. mylatexformat is not installed),
+    in which case callers should compile without it. A failed build is remembered, so
+    later CVs with the same preamble go straight to the full compile.
+    """
+    fmt_dir = Path(format_dir).resolve()
+    name = "cv-" + hashlib.sha256(preamble.encode("utf-8")).hexdigest()[:16]
+    if (fmt_dir / f"{name}.fmt").exists():
+        return name
+    if (fmt_dir, name) in _failed_formats:
+        return None
+
+    with _format_lock:
+        if (fmt_dir / f"{name}.fmt").exists():
+            return name
+        if (fmt_dir, name) in _failed_formats:
+            return None
+
+        fmt_dir.mkdir(parents=True, exist_ok=True)
+        build_name = f"{name}-build-{os.getpid()}"
+        (fmt_dir / f"{build_name}.tex").write_text(
+            preamble + "\\begin{document}\n\\end{document}\n", encoding="utf-8"
+        )
+        cmd = [
+            "pdflatex", "-ini", "-interaction=nonstopmode", f"-jobname={build_name}",
+            "&pdflatex", "mylatexformat.ltx", f"{build_name}.tex",
+        ]
+        start = time.perf_counter()
+        _run_pdflatex(cmd, fmt_dir, None, COMPILE_TIMEOUT_S, MEMORY_LIMIT_MB)
+
+        built = fmt_dir / f"{build_name}.fmt"
+        if not built.exists():
+            print(f"Could not precompile LaTeX preamble, see {fmt_dir / build_name}.log")
+            _failed_formats.add((fmt_dir, name))
+            return None
+        os.replace(built, fmt_dir / f"{name}.fmt")
+        print(f"Precompiled LaTeX preamble {name} in {time.perf_counter() - start:.1f}s")
+        return name
+
+
+def needs_rerun(log_file: Path) -> bool:
+    if not log_file.exists():
+        return False
+    return bool(RERUN_PATTERN.search(log_file.read_text(encoding="utf-8", errors="replace")))
+
+
+def compile_tex(
+    tex_file: Path,
+    use_format: bool = True,
+    timeout: float = COMPILE_TIMEOUT_S,
+    memory_limit_mb: int = MEMORY_LIMIT_MB,
+) -> CompileResult:
+    """
+    Compile tex_file to a PDF next to it.
+
+    Args:
+        tex_file (Path): .tex file to compile
+        use_format (bool): reuse a precompiled preamble format when possible
+        timeout (float): wall-clock limit in seconds for the whole build
+        memory_limit_mb (int): address-space limit per pdflatex process, 0 for none
+
+    Returns:
+        CompileResult: PDF path, passes, wall time, whether a format was used,
+        whether the build timed out and errors parsed from the log
+    """
+    tex_file = Path(tex_file).resolve()
+    out_dir = tex_file.parent
+    pdf_file = tex_file.with_suffix(".pdf")
+    log_file = tex_file.with_suffix(".log")
+    pdf_file.unlink(missing_ok=True)
+
+    env = None
+    fmt_name = None
+    if use_format:
+        preamble, _ = split_preamble(tex_file.read_text(encoding="utf-8"))
+        if preamble:
+            fmt_name = ensure_format(preamble)
+    if fmt_name:
+        # trailing separator keeps the default format search path after ours
+        env = {**os.environ, "TEXFORMATS": f"{Path(FORMAT_DIR).resolve()}{os.pathsep}"}
+
+    cmd = ["pdflatex", "-interaction=nonstopmode", "-output-directory", str(out_dir)]
+    if fmt_name:
+        cmd.append(f"-fmt={fmt_name}")
+    cmd.append(str(tex_file))
+
+    start = time.perf_counter()
+    passes = 0
+    timed_out = False
+    while passes < MAX_PASSES:
+        remaining = timeout - (time.perf_counter() - start)
+        if remaining <= 0 or not _run_pdflatex(cmd, out_dir, env, remaining, memory_limit_mb):
+            timed_out = True
+            break
+        passes += 1
+        if not needs_rerun(log_file):
+            break
+
+    return CompileResult(
+        pdf_path=pdf_file,
+        passes=passes,
+        seconds=time.perf_counter() - start,
+        used_format=fmt_name is not None,
+        timed_out=timed_out,
+        errors=parse_log_errors(log_file),
+    )
+
+
+def compile_many(
+    tex_files: list[Path],
+    max_workers: int | None = None,
+    timeout: float = COMPILE_TIMEOUT_S,
+    memory_limit_mb: int = MEMORY_LIMIT_MB,
+    use_format: bool = True,
+) -> list[CompileResult]:
+    """
+    Compile many .tex files concurrently, at most max_workers (default: CPU count) at a time.
+
+    Each build gets its own timeout and memory limit; a failing build does not affect
+    the others. Results are returned in the order of tex_files.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda tex_file: compile_tex(tex_file, use_format, timeout, memory_limit_mb),
+            tex_files,
+        ))
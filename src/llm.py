@@ -1,12 +1,10 @@
-import transformers, torch, json, re
-
-MODEL_ID = "meta-llama/Llama-3.1-8B-Instruct"
-pipeline = transformers.pipeline(
-    "text-generation",
-    model=MODEL_ID,
-    model_kwargs={"dtype": torch.bfloat16},
-    device_map="auto",
-)
+import json, os, queue, re, threading
+import model_provider
+from model_provider import get_llama, get_pipeline, model_name
+from llm_cache import cache_key, cached, get_cache
+import json_grammar
+import prefix_cache
+import tracing
 
 SYSTEM_PROMPT = """
 You read a CV and return ONLY a JSON array of job titles the candidate is qualified for.
@@ -21,12 +19,449 @@ Output format example:
 ["Data Scientist", "Machine Learning Engineer", "Quantitative Analyst"]
 """
 
-def extract_job_titles(cv_text: str) -> list[str]:
-    messages = [
+TITLE_BATCH_SIZE = 8
+TITLE_GENERATION = {"max_new_tokens": 128}
+
+# mask logits to the JSON schema of the expected output (see json_grammar.py)
+CONSTRAINED_DECODING = os.getenv("LLM_CONSTRAINED_DECODING", "0") in ("1", "true", "True")
+
+
+def set_constrained_decoding(enabled: bool):
+    global CONSTRAINED_DECODING
+    CONSTRAINED_DECODING = enabled
+
+
+def _title_messages(cv_text: str) -> list[dict]:
+    return [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": cv_text},
     ]
-    out = pipeline(messages, max_new_tokens=128, return_full_text=False)
-    raw = out[0]["generated_text"]
+
+
+def _parse_titles(raw: str) -> list[str]:
     match = re.search(r'\[[^\]]*\]', raw)
-    return json.loads(match.group(0)) if match else []
\ No newline at end of file
+    return json.loads(match.group(0)) if match else []
+
+
+def _title_key_parts(cv_text: str) -> dict:
+    parts = {"model": model_name(), "system": SYSTEM_PROMPT, "cv": cv_text, "params": TITLE_GENERATION}
+    if CONSTRAINED_DECODING:
+        parts["constrained"] = True
+    return parts
+
+
+def _constraint_kwargs(pipe, model) -> dict:
+    """Generation kwargs restricting output to JSON for model, or none if constrained decoding is off."""
+    if not CONSTRAINED_DECODING:
+        return {}
+    processor = json_grammar.make_logits_processor(
+        pipe.tokenizer, model, eos_token_id=pipe.model.generation_config.eos_token_id
+    )
+    return {"logits_processor": processor}
+
+
+# llama.cpp contexts are not thread-safe
+_llamacpp_lock = threading.Lock()
+
+
+def _llamacpp_kwargs(generation: dict, model=None) -> dict:
+    """Translate transformers-style generation kwargs into create_chat_completion arguments."""
+    kwargs = {"max_tokens": generation.get("max_new_tokens", 256)}
+    if generation.get("do_sample", True) is False:
+        kwargs["temperature"] = 0.0
+    elif "temperature" in generation:
+        kwargs["temperature"] = generation["temperature"]
+    if "top_p" in generation:
+        kwargs["top_p"] = generation["top_p"]
+    if CONSTRAINED_DECODING and model is not None:
+        # llama.cpp compiles the schema to a grammar and masks tokens natively
+        kwargs["response_format"] = {"type": "json_object", "schema": json_grammar.schema_for(model)}
+    return kwargs
+
+
+def _chat(messages: list[dict], generation: dict, model=None) -> str:
+    """
+    Generate a reply to messages with the configured backend.
+
+    Args:
+        messages (list[dict]): chat messages
+        generation (dict): transformers-style generation kwargs
+        model: pydantic model or type the reply must be JSON for when constrained decoding is on
+
+    Returns:
+        str: the generated text
+    """
+    with tracing.stage("llm.generate", backend=model_provider.BACKEND, model=model_name()):
+        if model_provider.BACKEND == "llamacpp":
+            llama = get_llama()
+            with _llamacpp_lock:
+                out = llama.create_chat_completion(messages=messages, **_llamacpp_kwargs(generation, model))
+            usage = out.get("usage") or {}
+            tracing.record(**{
+                "llm.input_tokens": usage.get("prompt_tokens"), "llm.output_tokens": usage.get("completion_tokens"),
+            })
+            return out["choices"][0]["message"]["content"]
+
+        pipe = get_pipeline()
+        constraint = _constraint_kwargs(pipe, model) if model is not None else {}
+        out = pipe(messages, return_full_text=False, **constraint, **generation)
+        text = out[0]["generated_text"]
+        _record_tokens(pipe.tokenizer, messages, text)
+        return text
+
+
+def _record_tokens(tokenizer, messages: list[dict] | None, text: str):
+    # the pipeline does not report token counts, so re-tokenize only when someone is looking
+    if not tracing.ENABLED:
+        return
+    counts = {"llm.output_tokens": len(tokenizer(text, add_special_tokens=False)["input_ids"])}
+    if messages is not None:
+        counts["llm.input_tokens"] = len(tokenizer.apply_chat_template(messages, add_generation_prompt=True))
+    tracing.record(**counts)
+
+
+def extract_job_titles(cv_text: str) -> list[str]:
+    def generate():
+        return _parse_titles(_chat(_title_messages(cv_text), TITLE_GENERATION, list[str]))
+
+    with tracing.stage("llm.extract_job_titles"):
+        return cached(generate, **_title_key_parts(cv_text))
+
+
+class JsonArrayScanner:
+    """
+    Incrementally scans text for the first JSON array of strings.
+
+    feed() returns each string element as soon as its closing quote is seen;
+    closed becomes True once the array's closing bracket has been read.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.closed = False
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+
+    def feed(self, text: str) -> list[str]:
+        items = []
+        for char in text:
+            if self.closed:
+                break
+            if self._in_string:
+                self._current.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self.depth == 1:
+                        items.append(json.loads("".join(self._current)))
+            elif char == '"' and self.depth > 0:
+                self._in_string = True
+                self._current = [char]
+            elif char == "[":
+                self.depth += 1
+            elif char == "]" and self.depth > 0:
+                self.depth -= 1
+                self.closed = self.depth == 0
+        return items
+
+
+def _array_closed_criteria(tokenizer):
+    """Stopping criterion that ends generation once a complete JSON array has been emitted."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class ArrayClosed(StoppingCriteria):
+        def __init__(self):
+            self.scanner = JsonArrayScanner()
+
+        def __call__(self, input_ids, scores, **kwargs):
+            self.scanner.feed(tokenizer.decode(input_ids[0, -1:], skip_special_tokens=True))
+            return torch.full((input_ids.shape[0],), self.scanner.closed, dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([ArrayClosed()])
+
+
+def _transformers_stream(messages: list[dict], generation: dict, model):
+    from transformers import TextIteratorStreamer
+
+    pipe = get_pipeline()
+    streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def generate():
+        try:
+            pipe(
+                messages,
+                return_full_text=False,
+                streamer=streamer,
+                stopping_criteria=_array_closed_criteria(pipe.tokenizer),
+                **_constraint_kwargs(pipe, model),
+                **generation,
+            )
+        except Exception as e:
+            # without its end signal the streamer would block the consumer forever
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+    try:
+        yield from streamer
+    finally:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _llamacpp_stream(messages: list[dict], generation: dict, model):
+    """
+    Decode in a producer thread, like the transformers path, so generation runs ahead of
+    the caller and _llamacpp_lock is not held while the caller works on a title.
+    Closing this generator stops decoding at the next chunk, which is how the early stop works.
+    """
+    llama = get_llama()
+    chunks = queue.Queue()
+    stop = threading.Event()
+
+    def decode():
+        try:
+            with _llamacpp_lock:
+                completion = llama.create_chat_completion(
+                    messages=messages, stream=True, **_llamacpp_kwargs(generation, model)
+                )
+                for chunk in completion:
+                    if stop.is_set():
+                        break
+                    text = chunk["choices"][0]["delta"].get("content")
+                    if text:
+                        chunks.put(text)
+                completion.close()
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(None)
+
+    threading.Thread(target=decode, daemon=True).start()
+    try:
+        while (item := chunks.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def stream_job_titles(cv_text: str):
+    """
+    Yield job titles for cv_text one by one while the model is still generating.
+
+    Decoding stops as soon as the JSON array is closed instead of running to
+    max_new_tokens. Results share the extract_job_titles cache entry, so a
+    cached CV yields its titles immediately.
+    """
+    cache = get_cache()
+    key = cache_key(**_title_key_parts(cv_text))
+    titles = cache.get(key) if cache.enabled else None
+    if titles is not None:
+        yield from titles
+        return
+
+    messages = _title_messages(cv_text)
+    if model_provider.BACKEND == "llamacpp":
+        chunks = _llamacpp_stream(messages, TITLE_GENERATION, list[str])
+    else:
+        chunks = _transformers_stream(messages, TITLE_GENERATION, list[str])
+
+    scanner = JsonArrayScanner()
+    titles = []
+    for chunk in chunks:
+        for title in scanner.feed(chunk):
+            titles.append(title)
+            yield title
+        if scanner.closed:
+            break
+    chunks.close()
+
+    if cache.enabled and titles and scanner.closed:
+        cache.put(key, titles)
+
+
+def extract_job_titles_batch(cv_texts: list[str], batch_size: int = TITLE_BATCH_SIZE) -> list[list[str]]:
+    """
+    Extract job titles for many CVs, batching prompts through the pipeline.
+
+    CVs are sorted by length so each padded batch holds prompts of similar size;
+    results are returned in the order of cv_texts. CVs already in the LLM cache
+    are not regenerated. llama.cpp decodes one sequence at a time, so with that
+    backend the CVs are simply processed in turn.
+    """
+    if model_provider.BACKEND == "llamacpp":
+        return [extract_job_titles(cv) for cv in cv_texts]
+
+    cache = get_cache()
+    keys = [cache_key(**_title_key_parts(cv)) for cv in cv_texts]
+    results = [cache.get(key) if cache.enabled else None for key in keys]
+
+    todo = [i for i, titles in enumerate(results) if titles is None]
+    if not todo:
+        return results
+
+    order = sorted(todo, key=lambda i: len(cv_texts[i]), reverse=True)
+    conversations = [_title_messages(cv_texts[i]) for i in order]
+
+    pipe = get_pipeline()
+    outs = []
+    # one pipeline call per batch: a constraint processor tracks its rows' JSON state, so each
+    # generate call needs a fresh one
+    for start in range(0, len(conversations), batch_size):
+        chunk = conversations[start:start + batch_size]
+        outs.extend(pipe(
+            chunk,
+            return_full_text=False,
+            batch_size=len(chunk),
+            **_constraint_kwargs(pipe, list[str]),
+            **TITLE_GENERATION,
+        ))
+
+    for i, out in zip(order, outs):
+        results[i] = _parse_titles(out[0]["generated_text"])
+        if cache.enabled and results[i]:
+            cache.put(keys[i], results[i])
+    return results
+
+
+RESUME_SYSTEM = """
+You generate a tailored resume for a specific job.
+Follow the template exactly.
+Insert only verifiable content from the CV.
+No hallucinations.
+No cover letter.
+ATS-safe.
+Return only the completed resume text.
+"""
+
+RESUME_TEMPLATE = """
+FULL NAME  
+City, Country  
+Phone | Email | LinkedIn | GitHub (optional)
+
+SUMMARY  
+Motivated <role> with experience in <key expertise areas>. Skilled in <top skills>.  
+Strong background in <domain>, with practical experience in <project/industry>.  
+Interested in opportunities in <target industry/role>.
+
+EDUCATION  
+UNIVERSITY NAME — Location  
+Degree Title | Graduation Year  
+Key modules: <modules>  
+Highlights: <awards, classifications, academic focus>
+
+UNIVERSITY NAME — Location  
+Degree Title | Graduation Year  
+Key modules: <modules>  
+Highlights: <awards, classifications, academic focus>
+
+PROFESSIONAL EXPERIENCE  
+INSTITUTION / COMPANY — Location  
+Role Title | Dates (Month YYYY – Month YYYY)  
+• <quantified achievement or responsibility>  
+• <work that demonstrates skill applied>  
+• <results, metrics, systems or technologies>
+
+INSTITUTION / COMPANY — Location  
+Role Title | Dates  
+• <quantified achievement or responsibility>  
+• <work that demonstrates skill applied>  
+• <results, metrics, systems or technologies>
+
+PROJECTS  
+PROJECT / RESEARCH TITLE  
+• <short one-sentence project description>  
+• Tech stack: <tools> | Key results: <metrics>  
+• <Outcome or contribution>
+
+PROJECT / RESEARCH TITLE  
+• <short one-sentence project description>  
+• Tech stack: <tools> | Key results: <metrics>  
+• <Outcome or contribution>
+
+SKILLS  
+Languages/Frameworks: <list>  
+ML / Data: <list>  
+Tools: <list>  
+Databases: <list>  
+Cloud/DevOps (optional): <list>
+
+CERTIFICATIONS  
+• <Certification Name> — <Issuing Org>  
+• <Certification Name> — <Issuing Org>
+
+LANGUAGES  
+• <Language> (Level)  
+• <Language> (Level)
+
+ADDITIONAL INFO (optional)  
+• Interests: <list>  
+• Visa status (if relevant): <e.g., Right to Work UK>  
+"""
+
+RESUME_GENERATION = {
+    "max_new_tokens": 512,
+    "do_sample": False,
+    "temperature": 0.0,
+    "top_p": 1.0,
+}
+
+def _resume_messages(cv_text: str, job: dict) -> tuple[list[dict], str]:
+    """Chat messages for a tailored resume, and the job-specific tail of the user message."""
+    # stable part first so its KV cache (and any provider-side prompt cache) is reused across jobs
+    stable = f"""
+Template:
+{RESUME_TEMPLATE}
+
+CV:
+{cv_text}
+"""
+    job_part = f"""
+Job title: {job.get('title')}
+Company: {job.get('company')}
+Location: {job.get('location')}
+Salary: {job.get('salary')}
+Job link: {job.get('link')}
+
+Job description (from listing if extracted):
+{job.get('description', '')}
+"""
+    msgs = [
+        {"role": "system", "content": RESUME_SYSTEM},
+        {"role": "user", "content": stable + job_part},
+    ]
+    return msgs, job_part
+
+
+def generate_tailored_resume(cv_text: str, job: dict) -> str:
+    msgs, job_part = _resume_messages(cv_text, job)
+    prompt = msgs[1]["content"]
+
+    def generate():
+        if model_provider.BACKEND == "transformers" and model_provider.SPECULATIVE:
+            # the draft model has to see the whole prompt too, so this path skips the prefix cache
+            assistant = model_provider.get_draft_model()
+            return _chat(msgs, {**RESUME_GENERATION, "assistant_model": assistant})
+        # llama.cpp already keeps the previous prompt's KV cache and reuses its matching prefix
+        if model_provider.BACKEND == "transformers" and prefix_cache.ENABLED:
+            prefix, suffix = prefix_cache.split_chat_prompt(msgs, job_part)
+            with tracing.stage("llm.generate", backend="transformers", model=model_name(), prefix_cache=True):
+                text = prefix_cache.generate_with_prefix(prefix, suffix, **RESUME_GENERATION)
+                _record_tokens(get_pipeline().tokenizer, msgs, text)
+            return text
+        return _chat(msgs, RESUME_GENERATION)
+
+    # greedy decoding makes the output a pure function of the prompt, so repeats are always hits;
+    # assisted generation verifies every draft token against the main model, so the key is unchanged
+    with tracing.stage("llm.generate_tailored_resume"):
+        return cached(generate, model=model_name(), system=RESUME_SYSTEM, prompt=prompt, params=RESUME_GENERATION)
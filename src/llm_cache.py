@@ -0,0 +1,156 @@
+"""
+Content-addressed on-disk cache for LLM outputs.
+
+Entries are keyed by a SHA-256 of everything that determines the output
+(model id, prompts, inputs and generation parameters) and stored in SQLite.
+The cache is bounded in size and evicts least recently used entries first.
+
+Set LLM_CACHE_DISABLE=1 (or call set_enabled(False)) to bypass it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def cache_key(**parts) -> str:
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), time.time()),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "enabled": self.enabled,
+        }
+
+
+_cache = LLMCache(enabled=os.getenv("LLM_CACHE_DISABLE", "") not in ("1", "true", "True"))
+
+
+def get_cache() -> LLMCache:
+    return _cache
+
+
+def set_enabled(enabled: bool):
+    _cache.enabled = enabled
+
+
+def cached(compute, **key_parts):
+    """
+    Return the cached result for key_parts, calling compute() and storing its
+    result on a miss. compute() is always called when the cache is disabled.
+    Empty results (e.g. no titles parsed) are not stored.
+    """
+    if not _cache.enabled:
+        return compute()
+    key = cache_key(**key_parts)
+    value = _cache.get(key)
+    if value is None:
+        value = compute()
+        if value:
+            _cache.put(key, value)
+    return value
+
+
+def forget(**key_parts):
+    """Drop the entry for key_parts, e.g. when the cached output turned out to be unusable."""
+    _cache.delete(cache_key(**key_parts))
+
+
+async def cached_async(compute, **key_parts):
+    """cached() for a coroutine function: await compute() on a miss."""
+    if not _cache.enabled:
+        return await compute()
+    key = cache_key(**key_parts)
+    value = _cache.get(key)
+    if value is None:
+        value = await compute()
+        if value:
+            _cache.put(key, value)
+    return value
@@ -0,0 +1,62 @@
+"""
+Client for the resident LLM worker (llm_worker.py).
+
+Mirrors extract_job_titles from llm.py. If no worker is reachable the call
+raises WorkerUnavailableError, unless LLM_LOCAL_FALLBACK=1 (or set_local_fallback(True))
+allows it to load the model in this process instead.
+"""
+
+import os
+import httpx
+
+WORKER_URL = os.getenv("LLM_WORKER_URL", "http://127.0.0.1:8765")
+REQUEST_TIMEOUT_S = 30 * 60
+# loading the model in-process duplicates the worker's memory, so it must be asked for
+LOCAL_FALLBACK = os.getenv("LLM_LOCAL_FALLBACK", "0") in ("1", "true", "True")
+
+
+class WorkerUnavailableError(RuntimeError):
+    pass
+
+
+def set_local_fallback(enabled: bool):
+    global LOCAL_FALLBACK
+    LOCAL_FALLBACK = enabled
+
+
+def worker_available(url: str = WORKER_URL) -> bool:
+    try:
+        return httpx.get(f"{url}/health", timeout=2.0).status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+def _use_local_model(url: str) -> bool:
+    """True if the worker at url is down and the in-process fallback is allowed."""
+    if worker_available(url):
+        return False
+    if not LOCAL_FALLBACK:
+        raise WorkerUnavailableError(
+            f"LLM worker not reachable at {url}; start it with 'python llm_worker.py' "
+            f"or set LLM_LOCAL_FALLBACK=1 to load the model in this process"
+        )
+    print(f"WARNING: LLM worker not reachable at {url}, loading the model in-process")
+    return True
+
+
+def _post(path: str, payload: dict, url: str) -> dict:
+    response = httpx.post(f"{url}{path}", json=payload, timeout=REQUEST_TIMEOUT_S)
+    response.raise_for_status()
+    return response.json()
+
+
+def extract_job_titles(cv_text: str, url: str = WORKER_URL) -> list[str]:
+    payload = {"cv_text": cv_text}
+    try:
+        return _post("/titles", payload, url)["titles"]
+    except httpx.ConnectError:
+        # the worker is only probed once a request could not reach it
+        if not _use_local_model(url):
+            return _post("/titles", payload, url)["titles"]
+    from llm import extract_job_titles as local_extract_job_titles
+    return local_extract_job_titles(cv_text)
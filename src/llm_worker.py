@@ -0,0 +1,148 @@
+"""
+Resident local LLM worker.
+
+Keeps the shared local model (see model_provider.py) loaded and serves
+title-extraction jobs over localhost HTTP, so callers such as job_queue.py
+pay generation time only instead of a full model load.
+
+Run from src/:
+    python llm_worker.py --port 8765
+
+Endpoints (JSON in, JSON out):
+    POST /titles   {"cv_text": ...}            -> {"titles": [...]}
+    GET  /health                               -> worker and model status
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fire
+
+import model_provider
+from llm import extract_job_titles
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+REQUEST_TIMEOUT_S = 30 * 60
+
+
+def _run_titles(payload: dict) -> dict:
+    return {"titles": extract_job_titles(payload["cv_text"])}
+
+
+HANDLERS = {
+    "/titles": _run_titles,
+}
+
+
+class InferenceQueue:
+    """Single consumer thread that runs jobs on the shared model in arrival order."""
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="llm-inference", daemon=True)
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, handler, payload: dict) -> Future:
+        future = Future()
+        self._jobs.put((handler, payload, future))
+        return future
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def _loop(self):
+        while True:
+            handler, payload, future = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            try:
+                result = handler(payload)
+            except Exception as e:
+                self.failed += 1
+                future.set_exception(e)
+            else:
+                self.completed += 1
+                result["elapsed_s"] = time.perf_counter() - start
+                future.set_result(result)
+
+
+class WorkerHandler(BaseHTTPRequestHandler):
+    inference: InferenceQueue = None
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": "not found"})
+        self._send(200, {
+            "status": "ok",
+            "backend": model_provider.BACKEND,
+            "model_id": model_provider.model_name(),
+            "loaded": model_provider.is_loaded(),
+            "load_stats": model_provider.load_stats(),
+            "pending": self.inference.pending(),
+            "completed": self.inference.completed,
+            "failed": self.inference.failed,
+        })
+
+    def do_POST(self):
+        handler = HANDLERS.get(self.path)
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid JSON body"})
+
+        future = self.inference.submit(handler, payload)
+        try:
+            self._send(200, future.result(timeout=REQUEST_TIMEOUT_S))
+        except KeyError as e:
+            self._send(400, {"error": f"missing field {e}"})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"[llm_worker] {self.address_string()} {format % args}")
+
+
+def main(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, warm: bool = True, backend: str | None = None):
+    if backend:
+        model_provider.set_backend(backend)
+    if warm:
+        model_provider.warmup()
+
+    inference = InferenceQueue()
+    inference.start()
+    WorkerHandler.inference = inference
+
+    server = ThreadingHTTPServer((host, port), WorkerHandler)
+    print(f"LLM worker listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -1,27 +1,68 @@
 import os
+from itertools import islice
 import fire
-from llm import extract_job_titles
-from apply_agent import process_jobs_sequential
+from llm import extract_job_titles, set_constrained_decoding, stream_job_titles
+from apply_agent import process_titles_parallel
+import llm_cache
+import model_provider
+import ranking
+import tracing
+from seen_index import get_index
+from create_optimised_cv import set_structured_output
+from cv_ingest import read_cv
 
-def main(cv_file: str, headless: bool = False, demo: bool = False):
-    with open(cv_file) as f:
-        cv_text = f.read()
+def main(cv_file: str, headless: bool = False, demo: bool = False, no_cache: bool = False,
+         workers: int = 1, pipeline: bool = False, bulk: bool = False, revisit: bool = False,
+         structured: bool = False, stream: bool = False,
+         constrained: bool = False, backend: str = model_provider.BACKEND, speculative: bool = False,
+         rank: bool = False, trace: bool | str = False):
+    if trace:
+        # --trace writes spans to .cache/traces, --trace=console prints them
+        tracing.setup("jsonl" if trace is True else trace)
+    else:
+        tracing.setup_from_env()
+    model_provider.set_backend(backend)
+    if speculative:
+        model_provider.set_speculative(True)
+    if rank:
+        # ranking needs the whole results list up front, which only bulk mode reads
+        ranking.set_enabled(True)
+        bulk = True
+    if no_cache:
+        llm_cache.set_enabled(False)
+    if revisit:
+        get_index().skip_processed = False
+    if structured:
+        set_structured_output(True)
+    if constrained:
+        set_constrained_decoding(True)
 
-    os.makedirs("outputs", exist_ok=True)
+    cv_text = read_cv(cv_file)
 
-    titles = extract_job_titles(cv_text)
-    print("Target roles:", titles)
+    os.makedirs("outputs", exist_ok=True)
 
-    if demo and titles:
-        titles = titles[:1]
+    if stream:
+        # titles are handed to the browser workers as soon as each one is decoded
+        titles = stream_job_titles(cv_text)
+    else:
+        titles = extract_job_titles(cv_text)
+        print("Target roles:", titles)
 
-    for title in titles:
-        print(f"\n=== Running for: {title} ===")
-        process_jobs_sequential(title, cv_text, headless=headless, limit=3, demo=demo)
+    if demo:
+        titles = islice(titles, 1)
 
-        if demo:
-            return
+    results = process_titles_parallel(
+        titles, cv_text, workers=workers, headless=headless, limit=3, demo=demo,
+        pipeline=pipeline, bulk=bulk
+    )
+    for title, result in results.items():
+        status = f"failed: {result['error']}" if result["error"] else f"{result['processed']} processed"
+        print(f"{title}: {status}")
 
+    print("LLM cache:", llm_cache.get_cache().stats())
+    print("Seen listings:", get_index().stats())
+    tracing.print_summary()
+    tracing.shutdown()
     print("Done.")
 
 if __name__ == "__main__":
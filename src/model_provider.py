@@ -0,0 +1,218 @@
+"""
+Shared, lazily loaded local LLM.
+
+The model is built on first use and kept for the lifetime of the process, so
+importing modules that need it (or running `--help`) is free and every caller
+in the process shares one copy of the weights.
+
+Two backends are available (LLM_BACKEND or set_backend()):
+    transformers  bf16 Hugging Face pipeline for MODEL_ID (GPU if available)
+    llamacpp      GGUF-quantized model run by llama.cpp on the CPU, with the
+                  weights memory-mapped instead of read into RAM
+
+With the transformers backend, LLM_SPECULATIVE=1 (or set_speculative()) enables
+assisted generation for greedy decoding: a small draft model from the same family
+(DRAFT_MODEL_ID) proposes tokens that the main model verifies in one forward pass.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BACKENDS = ("transformers", "llamacpp")
+BACKEND = os.getenv("LLM_BACKEND", "transformers")
+
+MODEL_ID = os.getenv("LLM_MODEL_ID", "meta-llama/Llama-3.1-8B-Instruct")
+
+# must share MODEL_ID's tokenizer
+DRAFT_MODEL_ID = os.getenv("LLM_DRAFT_MODEL_ID", "meta-llama/Llama-3.2-1B-Instruct")
+SPECULATIVE = os.getenv("LLM_SPECULATIVE", "0") in ("1", "true", "True")
+
+# llama.cpp: either a local .gguf file or a file in a Hugging Face repo
+GGUF_PATH = os.getenv("LLM_GGUF_PATH")
+GGUF_REPO = os.getenv("LLM_GGUF_REPO", "bartowski/Meta-Llama-3.1-8B-Instruct-GGUF")
+GGUF_FILE = os.getenv("LLM_GGUF_FILE", "Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf")
+LLAMACPP_THREADS = int(os.getenv("LLM_THREADS", 0)) or None  # None: llama.cpp picks the physical cores
+LLAMACPP_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", 512))
+LLAMACPP_CONTEXT = int(os.getenv("LLM_CONTEXT", 8192))
+
+_lock = threading.Lock()
+_pipelines = {}
+_load_stats = {}
+
+
+def set_backend(backend: str):
+    global BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    BACKEND = backend
+
+
+def set_speculative(enabled: bool):
+    global SPECULATIVE
+    SPECULATIVE = enabled
+
+
+def model_name() -> str:
+    """Identifier of the model the current backend runs, e.g. for cache keys."""
+    if BACKEND == "llamacpp":
+        return os.path.basename(GGUF_PATH) if GGUF_PATH else f"{GGUF_REPO}/{GGUF_FILE}"
+    return MODEL_ID
+
+
+def _rss_mb() -> float | None:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+@contextmanager
+def _recording_load(name: str, description: str):
+    """Time the model load done in the block and record it, with the memory it added, under name."""
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    yield
+    load_s = time.perf_counter() - start
+    rss_after = _rss_mb()
+
+    _load_stats[name] = {
+        "load_s": load_s,
+        "rss_mb": rss_after,
+        "rss_delta_mb": None if rss_before is None else rss_after - rss_before,
+    }
+    print(f"Loaded {description} in {load_s:.1f}s (rss: {_format_mb(rss_after)})")
+
+
+def get_pipeline(model_id: str = MODEL_ID):
+    """
+    Return the text-generation pipeline for model_id, loading it on first call.
+
+    Args:
+        model_id (str): Hugging Face model id
+
+    Returns:
+        transformers.Pipeline: the shared pipeline
+    """
+    pipe = _pipelines.get(model_id)
+    if pipe is not None:
+        return pipe
+
+    with _lock:
+        if model_id in _pipelines:
+            return _pipelines[model_id]
+
+        import torch
+        import transformers
+
+        with _recording_load(model_id, model_id):
+            pipe = transformers.pipeline(
+                "text-generation",
+                model=model_id,
+                model_kwargs={"dtype": torch.bfloat16},
+                device_map="auto",
+            )
+        # Llama ships without a pad token; batched generation needs one, padded on the left
+        if pipe.tokenizer.pad_token is None:
+            pipe.tokenizer.pad_token = pipe.tokenizer.eos_token
+        pipe.tokenizer.padding_side = "left"
+
+        _pipelines[model_id] = pipe
+        return pipe
+
+
+def get_draft_model(model_id: str = DRAFT_MODEL_ID):
+    """
+    Return the draft model used for assisted generation, loading it on first call.
+
+    Returns:
+        transformers.PreTrainedModel: the shared draft model
+    """
+    model = _pipelines.get(model_id)
+    if model is not None:
+        return model
+
+    with _lock:
+        if model_id in _pipelines:
+            return _pipelines[model_id]
+
+        import torch
+        from transformers import AutoModelForCausalLM
+
+        with _recording_load(model_id, f"draft model {model_id}"):
+            model = AutoModelForCausalLM.from_pretrained(model_id, dtype=torch.bfloat16, device_map="auto")
+
+        _pipelines[model_id] = model
+        return model
+
+
+def get_llama():
+    """
+    Return the llama.cpp model for the configured GGUF file, loading it on first call.
+
+    Weights are memory-mapped, so resident memory grows with the pages actually
+    touched and several processes share one copy through the page cache.
+
+    Returns:
+        llama_cpp.Llama: the shared model
+    """
+    name = model_name()
+    llama = _pipelines.get(name)
+    if llama is not None:
+        return llama
+
+    with _lock:
+        if name in _pipelines:
+            return _pipelines[name]
+
+        from llama_cpp import Llama
+
+        options = {
+            "n_ctx": LLAMACPP_CONTEXT,
+            "n_threads": LLAMACPP_THREADS,
+            "n_batch": LLAMACPP_BATCH_SIZE,
+            "use_mmap": True,
+            "verbose": False,
+        }
+        with _recording_load(name, f"{name} with llama.cpp"):
+            if GGUF_PATH:
+                llama = Llama(model_path=GGUF_PATH, **options)
+            else:
+                llama = Llama.from_pretrained(repo_id=GGUF_REPO, filename=GGUF_FILE, **options)
+
+        _pipelines[name] = llama
+        return llama
+
+
+def warmup(model_id: str | None = None) -> dict:
+    """Load the model of the current backend now (e.g. at worker start-up) and return its load stats."""
+    if BACKEND == "llamacpp":
+        get_llama()
+        return load_stats(model_name())
+    get_pipeline(model_id or MODEL_ID)
+    if SPECULATIVE:
+        get_draft_model()
+    return load_stats(model_id or MODEL_ID)
+
+
+def is_loaded(model_id: str | None = None) -> bool:
+    return (model_id or model_name()) in _pipelines
+
+
+def load_stats(model_id: str | None = None) -> dict:
+    """
+    Cold-start cost of model_id (default: the current backend's model): load time
+    in seconds and resident memory in MB.
+
+    Returns an empty dict if the model has not been loaded in this process.
+    """
+    stats = dict(_load_stats.get(model_id or model_name(), {}))
+    if stats:
+        stats["current_rss_mb"] = _rss_mb()
+    return stats
+
+
+def _format_mb(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:.0f} MB"
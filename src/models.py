@@ -8,5 +8,53 @@ class JobDetails(BaseModel):
     description: str | None
     link: str
 
+class JobListing(BaseModel):
+    title: str
+    company: str
+    link: str
+    snippet: str | None
+
+class SearchResultsPage(BaseModel):
+    listings: list[JobListing]
+    has_next_page: bool
+
 class CompanyBullets(BaseModel):
     summary_bullets: list[str]
+
+class CVHeader(BaseModel):
+    name: str
+    phone: str | None
+    email: str | None
+    linkedin: str | None
+    github: str | None
+
+class EducationEntry(BaseModel):
+    institution: str
+    location: str | None
+    degree: str
+    dates: str
+    bullets: list[str]
+
+class ExperienceEntry(BaseModel):
+    role: str
+    dates: str
+    organisation: str
+    location: str | None
+    bullets: list[str]
+
+class ProjectEntry(BaseModel):
+    name: str
+    technologies: str | None
+    dates: str | None
+    bullets: list[str]
+
+class SkillCategory(BaseModel):
+    category: str
+    items: list[str]
+
+class CVContent(BaseModel):
+    header: CVHeader
+    education: list[EducationEntry]
+    experience: list[ExperienceEntry]
+    projects: list[ProjectEntry]
+    skills: list[SkillCategory]
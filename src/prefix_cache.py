@@ -0,0 +1,111 @@
+"""
+KV-cache reuse of a shared prompt prefix for the local Llama model.
+
+Prompts are split into a stable prefix (system prompt, template, CV) and a
+job-specific suffix. The whole prompt is tokenized in one piece, so the model
+sees exactly the tokens it would without the cache; the leading tokens it shares
+with the tokenized prefix are run through the model once and their KV cache
+kept. Every later generation with the same prefix starts from a copy of that
+cache and only prefills the rest.
+
+Set LLM_PREFIX_CACHE=0 to disable.
+"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from model_provider import get_pipeline
+
+ENABLED = os.getenv("LLM_PREFIX_CACHE", "1") not in ("0", "false", "False")
+MAX_PREFIXES = 4
+
+_lock = threading.Lock()
+_prefixes = OrderedDict()
+
+
+def split_chat_prompt(messages: list[dict], suffix: str) -> tuple[str, str]:
+    """
+    Render messages with the chat template and split the result just before suffix,
+    which must be the tail of the last user message.
+    """
+    tokenizer = get_pipeline().tokenizer
+    rendered = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    cut = rendered.rindex(suffix)
+    return rendered[:cut], rendered[cut:]
+
+
+def _shared_length(prompt_ids: list[int], prefix_ids: list[int]) -> int:
+    """
+    Number of leading tokens of prompt_ids that equal prefix_ids.
+
+    A BPE merge across the split (e.g. a "\n\n" cut in half) changes the last
+    prefix tokens, so those are left for the suffix prefill.
+    """
+    shared = 0
+    for prompt_id, prefix_id in zip(prompt_ids, prefix_ids):
+        if prompt_id != prefix_id:
+            break
+        shared += 1
+    # generate needs at least one uncached prompt token
+    return min(shared, len(prompt_ids) - 1)
+
+
+def _prefix_cache(prefix_ids):
+    """Return (kv_cache, build_seconds) for the token ids prefix_ids, building it on a miss."""
+    import torch
+    from transformers import DynamicCache
+
+    key = hashlib.sha256(str(prefix_ids[0].tolist()).encode("utf-8")).hexdigest()
+    with _lock:
+        if key in _prefixes:
+            _prefixes.move_to_end(key)
+            return _prefixes[key], None
+
+        pipe = get_pipeline()
+        start = time.perf_counter()
+        cache = DynamicCache()
+        with torch.no_grad():
+            pipe.model(input_ids=prefix_ids, past_key_values=cache, use_cache=True)
+        build_s = time.perf_counter() - start
+
+        _prefixes[key] = cache
+        if len(_prefixes) > MAX_PREFIXES:
+            _prefixes.popitem(last=False)
+        return cache, build_s
+
+
+def generate_with_prefix(prefix: str, suffix: str, **generate_kwargs) -> str:
+    """
+    Generate a continuation of prefix + suffix, reusing the KV cache of prefix.
+
+    Prints the prefix length, how long its prefill took (on a miss) and the
+    time spent on the rest of the call, so cold and warm calls can be compared.
+    """
+    import torch
+
+    pipe = get_pipeline()
+    input_ids = pipe.tokenizer(prefix + suffix, add_special_tokens=False, return_tensors="pt").input_ids
+    input_ids = input_ids.to(pipe.model.device)
+    prefix_ids = pipe.tokenizer(prefix, add_special_tokens=False).input_ids
+    shared = _shared_length(input_ids[0].tolist(), prefix_ids)
+    cache, build_s = _prefix_cache(input_ids[:, :shared])
+
+    start = time.perf_counter()
+    with torch.no_grad():
+        out = pipe.model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            past_key_values=copy.deepcopy(cache),
+            pad_token_id=pipe.tokenizer.pad_token_id,
+            **generate_kwargs,
+        )
+    generate_s = time.perf_counter() - start
+
+    prefill = f"prefix prefill {build_s:.2f}s" if build_s is not None else "prefix reused"
+    print(f"Prefix cache: {shared} prefix + {input_ids.shape[1] - shared} new prompt tokens, "
+          f"{prefill}, generate {generate_s:.2f}s")
+    return pipe.tokenizer.decode(out[0, input_ids.shape[1]:], skip_special_tokens=True)
@@ -0,0 +1,123 @@
+"""
+Relevance ranking of job listings against a CV with a small local embedding model.
+
+The CV is embedded once (cached by its hash in memory and in the LLM cache) and
+every listing in one batch; listings are scored by cosine similarity with a
+single matrix-vector product, so only the most relevant ones reach the expensive
+CV tailoring and compile steps.
+
+Enable with RANK_LISTINGS=1 (or set_enabled(True)); EMBEDDING_MODEL_ID picks the model.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+from llm_cache import cached
+
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID", "sentence-transformers/all-MiniLM-L6-v2")
+ENABLED = os.getenv("RANK_LISTINGS", "0") in ("1", "true", "True")
+EMBED_BATCH_SIZE = 32
+MAX_TOKENS = 256
+
+_lock = threading.Lock()
+_model = None
+_cv_embeddings = {}
+
+
+def set_enabled(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+
+def _load():
+    global _model
+    if _model is not None:
+        return _model
+    with _lock:
+        if _model is None:
+            from transformers import AutoModel, AutoTokenizer
+
+            start = time.perf_counter()
+            tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_ID)
+            model = AutoModel.from_pretrained(EMBEDDING_MODEL_ID).eval()
+            _model = (tokenizer, model)
+            print(f"Loaded {EMBEDDING_MODEL_ID} in {time.perf_counter() - start:.1f}s")
+        return _model
+
+
+def embed(texts: list[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """
+    Embed texts with mean pooling over the model's token embeddings.
+
+    Returns:
+        np.ndarray: float32 array of shape (len(texts), dim), rows L2-normalised
+    """
+    import torch
+
+    tokenizer, model = _load()
+    chunks = []
+    for start in range(0, len(texts), batch_size):
+        batch = tokenizer(
+            texts[start:start + batch_size], padding=True, truncation=True,
+            max_length=MAX_TOKENS, return_tensors="pt"
+        )
+        with torch.no_grad():
+            hidden = model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        chunks.append(pooled.float().numpy())
+
+    vectors = np.concatenate(chunks) if chunks else np.zeros((0, model.config.hidden_size), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def cv_embedding(cv_text: str) -> np.ndarray:
+    """Embedding of cv_text, computed once per CV hash."""
+    digest = hashlib.sha256(cv_text.encode("utf-8")).hexdigest()
+    vector = _cv_embeddings.get(digest)
+    if vector is None:
+        values = cached(lambda: embed([cv_text])[0].tolist(), model=EMBEDDING_MODEL_ID, cv_sha256=digest)
+        vector = _cv_embeddings.setdefault(digest, np.asarray(values, dtype=np.float32))
+    return vector
+
+
+def listing_text(item) -> str:
+    """Text embedded for a JobListing (title + snippet) or JobDetails (title + description)."""
+    body = getattr(item, "snippet", None) or getattr(item, "description", None) or ""
+    return f"{item.title}\n{item.company}\n{body}"
+
+
+def rank_listings(cv_text: str, listings: list, top_k: int | None = None, text=listing_text) -> list[tuple]:
+    """
+    Order listings by cosine similarity of their text to the CV.
+
+    Args:
+        cv_text (str): candidate CV text
+        listings (list): JobListing / JobDetails records (anything text() accepts)
+        top_k (int): keep only the top_k best listings; all of them if None
+        text: function returning the text to embed for one listing
+
+    Returns:
+        list[tuple]: (listing, score) pairs, best first
+    """
+    if not listings:
+        return []
+    start = time.perf_counter()
+    matrix = embed([text(listing) for listing in listings])
+    scores = matrix @ cv_embedding(cv_text)
+
+    k = len(listings) if top_k is None else min(top_k, len(listings))
+    if k <= 0:
+        return []
+    # argpartition finds the top k in linear time; only those k are sorted
+    best = np.argpartition(-scores, k - 1)[:k] if k < len(listings) else np.arange(len(listings))
+    best = best[np.argsort(-scores[best], kind="stable")]
+
+    print(f"Ranked {len(listings)} listings in {time.perf_counter() - start:.2f}s, "
+          f"keeping {k} (scores {scores[best[0]]:.2f}..{scores[best[-1]]:.2f})")
+    return [(listings[i], float(scores[i])) for i in best]
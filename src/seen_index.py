@@ -0,0 +1,137 @@
+"""
+Persistent index of Reed listings that have already been processed.
+
+Listings are keyed by their normalised link and, as a fallback for listings
+seen without a link, by normalised (title, company). Both keys are indexed, so
+lookups stay constant-time in practice with tens of thousands of rows.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+INDEX_PATH = os.getenv("SEEN_INDEX_PATH", ".cache/seen_listings.sqlite")
+
+APPLIED = "applied"
+FAILED = "failed"
+
+
+# query parameters that only say how a listing was reached, never which listing it is
+TRACKING_PARAMS = {
+    "gh_src", "source", "src", "ref", "referrer", "trk", "fbclid", "gclid", "msclkid",
+    "mc_cid", "mc_eid", "_ga", "_gl",
+}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def normalize_link(link: str) -> str:
+    """
+    Lower-case scheme and host, drop fragment, trailing slash and tracking parameters,
+    and sort the remaining query parameters, which may identify the listing (e.g. ?job=1).
+    """
+    parts = urlsplit(link.strip())
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def normalize_title_company(title: str, company: str) -> str:
+    norm = lambda x: re.sub(r"[^a-z0-9]+", " ", (x or "").lower()).strip()
+    return f"{norm(title)}|{norm(company)}"
+
+
+class SeenIndex:
+    def __init__(self, path: str = INDEX_PATH, skip_processed: bool = True):
+        self.path = path
+        self.skip_processed = skip_processed
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                " link_key TEXT PRIMARY KEY,"
+                " title_company_key TEXT NOT NULL,"
+                " title TEXT,"
+                " company TEXT,"
+                " link TEXT,"
+                " status TEXT NOT NULL,"
+                " first_seen REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS listings_title_company ON listings(title_company_key)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, link: str | None = None, title: str | None = None, company: str | None = None) -> dict | None:
+        """Look a listing up by link, falling back to (title, company)."""
+        with self._lock:
+            conn = self._connect()
+            row = None
+            if link:
+                row = conn.execute(
+                    "SELECT title, company, link, status, first_seen, updated_at"
+                    " FROM listings WHERE link_key = ?",
+                    (normalize_link(link),),
+                ).fetchone()
+            if row is None and title and company:
+                row = conn.execute(
+                    "SELECT title, company, link, status, first_seen, updated_at"
+                    " FROM listings WHERE title_company_key = ? LIMIT 1",
+                    (normalize_title_company(title, company),),
+                ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("title", "company", "link", "status", "first_seen", "updated_at"), row))
+
+    def is_processed(self, link: str | None = None, title: str | None = None, company: str | None = None) -> bool:
+        entry = self.get(link, title, company)
+        return entry is not None and entry["status"] == APPLIED
+
+    def mark(self, job: dict, status: str):
+        """Record job (a JobDetails/JobListing dict) with status, keeping its first_seen time."""
+        link = job.get("link") or ""
+        tc_key = normalize_title_company(job.get("title"), job.get("company"))
+        link_key = normalize_link(link) if link else f"title:{tc_key}"
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO listings"
+                " (link_key, title_company_key, title, company, link, status, first_seen, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(link_key) DO UPDATE SET"
+                " status = excluded.status, updated_at = excluded.updated_at",
+                (link_key, tc_key, job.get("title"), job.get("company"), link, status, now, now),
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+            by_status = dict(conn.execute("SELECT status, COUNT(*) FROM listings GROUP BY status").fetchall())
+        return {"total": total, **by_status}
+
+
+_index = SeenIndex()
+
+
+def get_index() -> SeenIndex:
+    return _index
@@ -0,0 +1,266 @@
+"""
+Opt-in per-stage latency, token and browser-action tracing built on OpenTelemetry.
+
+Call setup() once (main.py --trace, or TRACE=jsonl / TRACE=console) and wrap work in
+stage(name) blocks. Every finished span is exported as one JSON line to
+.cache/traces/<run>.jsonl (or printed with the console exporter) and aggregated
+in memory for print_summary(), which shows p50/p95 per stage and averages per job.
+
+Token counts and browser actions are recorded with record(); numeric values also
+add up on the enclosing job() span. trace_browser() wraps a NovaAct session so
+every act / go_to_url call is counted and timed.
+
+When tracing is off every function here is a cheap no-op.
+"""
+
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_DIR = os.getenv("TRACE_DIR", ".cache/traces")
+ENABLED = False
+
+_tracer = None
+_provider = None
+_summary = None
+_job_counters = contextvars.ContextVar("job_counters", default=None)
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def setup(exporter: str = "jsonl", path: str | None = None) -> str | None:
+    """
+    Turn tracing on for this process.
+
+    Args:
+        exporter (str): "jsonl" to append spans to a file, "console" to print them
+        path (str): JSONL file (default: a new file per run under TRACE_DIR)
+
+    Returns:
+        str | None: the JSONL path spans are written to, if any
+    """
+    global ENABLED, _tracer, _provider, _summary
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+    class SummaryProcessor(SpanProcessor):
+        def on_end(self, span):
+            _summary.on_end(span)
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": "ascension"}))
+    _summary = _StageSummary()
+    _provider.add_span_processor(SummaryProcessor())
+
+    if exporter == "console":
+        _provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "jsonl":
+        path = path or str(Path(TRACE_DIR) / f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        _provider.add_span_processor(SimpleSpanProcessor(_jsonl_exporter(path)))
+    else:
+        raise ValueError(f"Unknown trace exporter '{exporter}', expected 'jsonl' or 'console'")
+
+    _tracer = _provider.get_tracer("ascension")
+    ENABLED = True
+    print(f"Tracing enabled ({exporter}{': ' + path if exporter == 'jsonl' else ''})")
+    return path if exporter == "jsonl" else None
+
+
+def setup_from_env():
+    exporter = os.getenv("TRACE", "")
+    if exporter and exporter not in ("0", "false", "False"):
+        setup("jsonl" if exporter in ("1", "true", "True") else exporter)
+
+
+def shutdown():
+    if _provider is not None:
+        _provider.shutdown()
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Time the enclosed block as a span called name."""
+    if not ENABLED:
+        yield _NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as span:
+        yield span
+
+
+@contextmanager
+def job(**attributes):
+    """
+    A span for one listing from scrape to apply. Numbers passed to record() inside
+    it are summed and attached to the job span as job.<name> when it ends.
+    """
+    if not ENABLED:
+        yield _NOOP_SPAN
+        return
+    counters = {}
+    token = _job_counters.set(counters)
+    try:
+        with stage("job", **attributes) as span:
+            try:
+                yield span
+            finally:
+                for key, value in counters.items():
+                    span.set_attribute(f"job.{key}", value)
+    finally:
+        _job_counters.reset(token)
+
+
+def record(**attributes):
+    """Attach attributes to the current span; numeric ones also add up on the enclosing job."""
+    if not ENABLED:
+        return
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    counters = _job_counters.get()
+    for key, value in _clean(attributes).items():
+        span.set_attribute(key, value)
+        if counters is not None and isinstance(value, (int, float)) and not isinstance(value, bool):
+            counters[key] = counters.get(key, 0) + value
+
+
+def bind(fn):
+    """Run fn (e.g. in an executor thread) inside the caller's current span and job."""
+    if not ENABLED:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class TracedBrowser:
+    """NovaAct proxy that records a span and a browser action for every act / go_to_url."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def act(self, prompt: str, *args, **kwargs):
+        with stage("browser.act", prompt=prompt[:80]):
+            record(**{"browser.actions": 1})
+            return self._session.act(prompt, *args, **kwargs)
+
+    def go_to_url(self, url: str):
+        with stage("browser.go_to_url", url=url):
+            record(**{"browser.actions": 1})
+            return self._session.go_to_url(url)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def trace_browser(session):
+    return TracedBrowser(session) if ENABLED and session is not None else session
+
+
+def _clean(attributes: dict) -> dict:
+    # OpenTelemetry attributes must be str, bool, int, float or sequences of those
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items() if value is not None
+    }
+
+
+def _jsonl_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonlSpanExporter(SpanExporter):
+        def __init__(self):
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+            self._lock = threading.Lock()
+
+        def export(self, spans):
+            with self._lock:
+                for span in spans:
+                    self._file.write(json.dumps({
+                        "name": span.name,
+                        "trace_id": f"{span.context.trace_id:032x}",
+                        "span_id": f"{span.context.span_id:016x}",
+                        "parent_id": f"{span.parent.span_id:016x}" if span.parent else None,
+                        "start": span.start_time / 1e9,
+                        "duration_ms": (span.end_time - span.start_time) / 1e6,
+                        "status": span.status.status_code.name,
+                        "attributes": dict(span.attributes or {}),
+                    }) + "\n")
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            self._file.close()
+
+    return JsonlSpanExporter()
+
+
+class _StageSummary:
+    """Keeps every finished span's duration and numeric attributes, by span name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+        self.totals = {}
+        self.jobs = []
+
+    def on_end(self, span):
+        duration = (span.end_time - span.start_time) / 1e9
+        numbers = {
+            key: value for key, value in (span.attributes or {}).items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        with self._lock:
+            self.durations.setdefault(span.name, []).append(duration)
+            totals = self.totals.setdefault(span.name, {})
+            for key, value in numbers.items():
+                totals[key] = totals.get(key, 0) + value
+            if span.name == "job":
+                self.jobs.append({"seconds": duration, **numbers})
+
+
+def _percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+def summary_table() -> str:
+    """p50/p95 latency per stage, followed by per-job averages of tokens and browser actions."""
+    if _summary is None:
+        return "Tracing was not enabled."
+    with _summary._lock:
+        durations = {name: list(values) for name, values in _summary.durations.items()}
+        totals = {name: dict(values) for name, values in _summary.totals.items()}
+        jobs = list(_summary.jobs)
+
+    lines = [f"{'stage':<28}{'n':>6}{'p50 s':>9}{'p95 s':>9}{'total s':>10}  totals"]
+    for name in sorted(durations, key=lambda n: -sum(durations[n])):
+        values = durations[name]
+        extra = ", ".join(f"{k}={v:g}" for k, v in sorted(totals.get(name, {}).items()) if not k.startswith("job."))
+        lines.append(f"{name:<28}{len(values):>6}{_percentile(values, 0.5):>9.2f}{_percentile(values, 0.95):>9.2f}"
+                     f"{sum(values):>10.1f}  {extra}")
+
+    if jobs:
+        keys = sorted({k for j in jobs for k in j if k.startswith("job.")})
+        lines.append(f"\n{len(jobs)} jobs, per job:")
+        for key in ["seconds", *keys]:
+            values = [j.get(key, 0) for j in jobs]
+            lines.append(f"  {key.removeprefix('job.'):<26} p50={_percentile(values, 0.5):<10g} "
+                         f"p95={_percentile(values, 0.95):<10g} mean={sum(values) / len(values):g}")
+    return "\n".join(lines)
+
+
+def print_summary():
+    if ENABLED:
+        print("\nTrace summary:")
+        print(summary_table())
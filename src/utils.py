@@ -1,3 +1,10 @@
-def make_filename(title: str, company: str) -> str:
+import hashlib
+
+
+def make_filename(title: str, company: str, link: str | None = None) -> str:
     safe = lambda x: "".join(c for c in x if c.isalnum() or c in " _-").strip().replace(" ", "_")
-    return f"{safe(title)}_{safe(company)}"
\ No newline at end of file
+    name = f"{safe(title)}_{safe(company)}"
+    if link:
+        # postings with the same title at one company only differ by their link
+        name += "_" + hashlib.sha1(link.encode("utf-8")).hexdigest()[:8]
+    return name
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("nova_act")
+
+import apply_agent
+from seen_index import SeenIndex
+
+
+class FakeSession:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def go_to_url(self, url):
+        pass
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    monkeypatch.setattr(apply_agent, "NovaAct", FakeSession)
+    monkeypatch.setattr(apply_agent, "process_jobs_in_session", lambda n, title, cv_text, **kwargs: 1)
+
+
+def test_parallel_titles_all_run(browser):
+    results = apply_agent.process_titles_parallel(["a", "b", "c"], "cv", workers=2)
+
+    assert results == {title: {"processed": 1, "error": None} for title in "abc"}
+
+
+def test_a_failing_titles_iterator_fails_the_run(browser):
+    def titles():
+        yield "a"
+        raise ValueError("stream broke")
+
+    with pytest.raises(ValueError, match="stream broke"):
+        apply_agent.process_titles_parallel(titles(), "cv", workers=2)
+
+
+class PagedSession:
+    """Two Reed results pages of two listings each; every listing opens as its own job."""
+
+    def __init__(self):
+        self.page = SimpleNamespace(url=RESULTS)
+        self.results_read = 0
+
+    def go_to_url(self, url):
+        self.page.url = url
+
+    def act(self, prompt, schema=None, **kwargs):
+        if prompt == apply_agent.SEARCH_RESULTS_PROMPT:
+            self.results_read += 1
+            number = int(self.page.url.rsplit("=", 1)[1])
+            links = [f"/jobs/{2 * number - 1}", f"/jobs/{2 * number}"]
+            return act_result({
+                "listings": [{"title": "Engineer", "company": link, "link": link, "snippet": None}
+                             for link in links],
+                "has_next_page": number < 2,
+            })
+        if prompt.startswith("Click the 'Next' page"):
+            number = int(self.page.url.rsplit("=", 1)[1])
+            self.page.url = f"{RESULTS[:-1]}{number + 1}"
+        elif prompt == apply_agent.JOB_DETAILS_PROMPT:
+            return act_result({"title": "Engineer", "company": self.page.url, "location": None,
+                               "salary": None, "description": "", "link": self.page.url})
+        return act_result(None)
+
+
+RESULTS = "https://www.reed.co.uk/jobs?pageno=1"
+
+
+def act_result(parsed):
+    return SimpleNamespace(matches_schema=parsed is not None, parsed_response=parsed)
+
+
+@pytest.fixture
+def applications(monkeypatch, tmp_path):
+    applied = []
+    monkeypatch.setattr(apply_agent, "get_index", lambda: SeenIndex(str(tmp_path / "seen.sqlite")))
+    monkeypatch.setattr(apply_agent, "tailor_cv", lambda job, cv_text, listing_url: "cv.pdf")
+    monkeypatch.setattr(apply_agent, "apply_to_job",
+                        lambda n, job, resume_path: applied.append(n.page.url) or True)
+    return applied
+
+
+@pytest.mark.parametrize("process", [apply_agent.process_jobs_in_session, apply_agent.process_jobs_pipelined])
+def test_listings_come_from_later_results_pages_up_to_limit(applications, process):
+    n = PagedSession()
+
+    assert process(n, "Engineer", "cv", limit=3) == 3
+
+    assert applications == [f"https://www.reed.co.uk/jobs/{i}" for i in (1, 2, 3)]
+    assert n.results_read == 2
+
+
+@pytest.mark.parametrize("process", [apply_agent.process_jobs_in_session, apply_agent.process_jobs_pipelined])
+def test_later_results_pages_are_not_read_once_limit_is_reached(applications, process):
+    n = PagedSession()
+
+    assert process(n, "Engineer", "cv", limit=2) == 2
+    assert n.results_read == 1
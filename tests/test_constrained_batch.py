@@ -0,0 +1,108 @@
+"""
+Constrained title extraction over more CVs than fit in one batch.
+
+A fake pipeline runs a greedy decode loop through the real JsonSchemaLogitsProcessor,
+over a character-level vocabulary, so no model weights are needed.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import llm
+import llm_cache
+
+VOCAB = ["<eos>", "[", "]", '"', ",", " "] + [chr(c) for c in range(ord("A"), ord("z") + 1) if chr(c).isalpha()]
+EOS = 0
+
+
+class CharTokenizer:
+    eos_token_id = EOS
+    all_special_ids = [EOS]
+
+    def __len__(self):
+        return len(VOCAB)
+
+    def decode(self, ids):
+        return "".join(VOCAB[i] for i in ids if i != EOS)
+
+
+class GreedyPipeline:
+    """Decodes a fixed preferred reply per row, letting the logits processor veto tokens."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.tokenizer = CharTokenizer()
+        self.model = SimpleNamespace(generation_config=SimpleNamespace(eos_token_id=EOS))
+        self.calls = 0
+
+    def __call__(self, conversations, return_full_text=False, batch_size=1, logits_processor=(),
+                 max_new_tokens=64, **generation):
+        self.calls += 1
+        outs = []
+        for start in range(0, len(conversations), batch_size):
+            chunk = conversations[start:start + batch_size]
+            # prompts of different lengths per batch, like sorted CVs
+            input_ids = torch.full((len(chunk), 3 + start), 5, dtype=torch.long)
+            texts = [""] * len(chunk)
+            done = [False] * len(chunk)
+            for step in range(max_new_tokens):
+                scores = torch.zeros((len(chunk), len(VOCAB)))
+                want = self.reply[step] if step < len(self.reply) else "<eos>"
+                scores[:, VOCAB.index(want)] = 10.0
+                for processor in logits_processor:
+                    scores = processor(input_ids, scores)
+                next_ids = scores.argmax(dim=-1)
+                for row, token in enumerate(next_ids.tolist()):
+                    if token == EOS:
+                        done[row] = True
+                    elif not done[row]:
+                        texts[row] += VOCAB[token]
+                if all(done):
+                    break
+                input_ids = torch.cat([input_ids, next_ids[:, None]], dim=1)
+            outs.extend([{"generated_text": text}] for text in texts)
+        return outs
+
+
+@pytest.fixture
+def constrained(monkeypatch):
+    pipe = GreedyPipeline('["Engineer", "Analyst"]')
+    monkeypatch.setattr(llm, "get_pipeline", lambda: pipe)
+    monkeypatch.setattr(llm.model_provider, "BACKEND", "transformers")
+    monkeypatch.setattr(llm, "CONSTRAINED_DECODING", True)
+    monkeypatch.setattr(llm_cache.get_cache(), "enabled", False)
+    return pipe
+
+
+def test_every_batch_gets_titles(constrained):
+    cv_texts = [f"CV number {i} " * (i + 1) for i in range(5)]
+
+    results = llm.extract_job_titles_batch(cv_texts, batch_size=2)
+
+    assert results == [["Engineer", "Analyst"]] * 5
+    assert constrained.calls == 3
+
+
+def test_processor_resets_for_a_new_generate_call():
+    from json_grammar import make_logits_processor
+
+    processor = make_logits_processor(CharTokenizer(), list[str], eos_token_id=EOS)[0]
+    quote = VOCAB.index('"')
+
+    first = torch.full((2, 4), 5, dtype=torch.long)
+    processor(first, torch.zeros((2, len(VOCAB))))
+    for token in ("[", "]"):
+        first = torch.cat([first, torch.full((2, 1), VOCAB.index(token))], dim=1)
+        processor(first, torch.zeros((2, len(VOCAB))))
+    assert all(processor.machine.is_complete(state) for state in processor.states)
+
+    # a smaller batch with a different prompt length must start from an empty document again
+    second = torch.full((1, 7), 5, dtype=torch.long)
+    scores = processor(second, torch.zeros((1, len(VOCAB))))
+    assert scores[0, VOCAB.index("[")] == 0
+    assert scores[0, EOS] == float("-inf")
+    assert scores[0, quote] == float("-inf")
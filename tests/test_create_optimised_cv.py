@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("jinja2")
+
+import create_optimised_cv as cv
+import llm_cache
+from latex import CompileResult, LatexCompileError
+from cv_template import render_cv
+from models import CVContent, CVHeader, ExperienceEntry, JobDetails, ProjectEntry
+
+
+class FakeResponses:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        usage = SimpleNamespace(input_tokens=10, output_tokens=10, input_tokens_details=None)
+        return SimpleNamespace(output_text=self.replies.pop(0), usage=usage)
+
+
+@pytest.fixture
+def openai(monkeypatch, tmp_path):
+    responses = FakeResponses([r"\broken", r"\documentclass{article}"])
+    monkeypatch.setattr(cv, "_openai_client", lambda: SimpleNamespace(responses=responses))
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.sqlite")))
+    return responses
+
+
+def fake_compile(tex_file):
+    ok = "documentclass" in tex_file.read_text()
+    pdf = tex_file.with_suffix(".pdf")
+    if ok:
+        pdf.write_bytes(b"%PDF")
+    return CompileResult(pdf_path=pdf, passes=1, seconds=0.0, used_format=False)
+
+
+def test_latex_that_fails_to_compile_is_not_cached(openai, monkeypatch, tmp_path):
+    monkeypatch.setattr(cv, "compile_tex", fake_compile)
+
+    with pytest.raises(LatexCompileError):
+        cv.create_optimised_cv("cv", "job", str(tmp_path), "out", structured=False)
+    # the rerun asks the model again instead of replaying the broken reply
+    pdf = cv.create_optimised_cv("cv", "job", str(tmp_path), "out", structured=False)
+
+    assert pdf.endswith("out.pdf")
+    assert openai.calls == 2
+    # and the reply that compiled is kept
+    cv.create_optimised_cv("cv", "job", str(tmp_path), "out", structured=False)
+    assert openai.calls == 2
+
+
+def test_batch_gives_every_posting_its_own_files(monkeypatch, tmp_path):
+    filenames = []
+
+    async def fake_tailor(extended_cv, job_description, output_dir, filename, structured=None):
+        filenames.append(filename)
+        return filename
+
+    monkeypatch.setattr(cv, "create_optimised_cv_async", fake_tailor)
+    job = JobDetails(title="Data Engineer", company="Acme", location=None, salary=None,
+                     description="", link="https://boards.greenhouse.io/acme/jobs/1")
+    jobs = [job, job.model_copy(update={"link": "https://boards.greenhouse.io/acme/jobs/2"}), job]
+
+    cv.create_optimised_cvs("cv", jobs, str(tmp_path))
+
+    assert len(set(filenames)) == 3
+    assert all(name.startswith("Data_Engineer_Acme_") for name in filenames)
+
+
+def cv_content(bullets: list[str]) -> CVContent:
+    return CVContent(
+        header=CVHeader(name="Ada", phone=None, email=None, linkedin=None, github=None),
+        education=[],
+        experience=[ExperienceEntry(role="Engineer", dates="2024", organisation="Acme", location=None,
+                                    bullets=bullets)],
+        projects=[ProjectEntry(name="Parser", technologies=None, dates=None, bullets=bullets)],
+        skills=[],
+    )
+
+
+def item_lists(latex: str) -> int:
+    body = latex[latex.index("\\begin{document}"):]
+    return body.count("\\resumeItemListStart")
+
+
+def test_entries_without_bullets_have_no_empty_list():
+    assert item_lists(render_cv(cv_content([]))) == 0
+    assert item_lists(render_cv(cv_content(["Shipped it"]))) == 2
+
+
+def test_refused_structured_request_raises_a_clear_error(monkeypatch, tmp_path):
+    refusal = SimpleNamespace(type="refusal", refusal="I can't help with that.")
+    response = SimpleNamespace(output_parsed=None, output=[SimpleNamespace(content=[refusal])],
+                               usage=SimpleNamespace(input_tokens=1, output_tokens=1, input_tokens_details=None))
+    client = SimpleNamespace(responses=SimpleNamespace(parse=lambda **request: response))
+    monkeypatch.setattr(cv, "_openai_client", lambda: client)
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.sqlite")))
+
+    with pytest.raises(cv.CVContentRefusedError, match="I can't help with that"):
+        cv.create_optimised_cv("cv", "job", str(tmp_path), "out", structured=True)
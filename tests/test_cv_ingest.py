@@ -0,0 +1,81 @@
+import tracemalloc
+import zipfile
+
+import pytest
+
+import cv_ingest
+from cv_ingest import CVIngestError, read_cv
+
+DOCUMENT = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    "{paragraphs}</w:body></w:document>"
+)
+
+
+def paragraph(text: str) -> str:
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def write_docx(path, paragraphs: list[str]):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT.format(paragraphs="".join(paragraphs)))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def text_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cv_ingest, "CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_docx_text(tmp_path):
+    path = write_docx(tmp_path / "cv.docx", [paragraph("Ada Lovelace"), paragraph("Engineer")])
+
+    assert read_cv(str(path)) == "Ada Lovelace\nEngineer"
+
+
+@pytest.mark.parametrize("name, content", [
+    ("not_a_zip.docx", b"plain text renamed to .docx"),
+    ("no_document.docx", None),
+    ("truncated_xml.docx", "<w:document><w:body>"),
+])
+def test_corrupt_docx_raises_ingest_error(tmp_path, name, content):
+    path = tmp_path / name
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("word/other.xml" if content is None else "word/document.xml", content or "")
+
+    with pytest.raises(CVIngestError, match="not a readable DOCX"):
+        read_cv(str(path))
+
+
+def test_corrupt_pdf_raises_ingest_error(tmp_path):
+    pytest.importorskip("pypdf")
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(b"%PDF-1.7\nthis is not really a PDF")
+
+    with pytest.raises(CVIngestError, match="not a readable PDF"):
+        read_cv(str(path))
+
+
+def peak_parse_memory(path) -> int:
+    tracemalloc.start()
+    for _ in cv_ingest._docx_pages(str(path)):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_docx_memory_does_not_grow_with_the_document(tmp_path):
+    page_break = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+    def pages(n: int) -> list[str]:
+        return [paragraph(f"Line {i}") + (page_break if i % 100 == 99 else "") for i in range(n)]
+
+    short = peak_parse_memory(write_docx(tmp_path / "short.docx", pages(5000)))
+    long = peak_parse_memory(write_docx(tmp_path / "long.docx", pages(40000)))
+
+    # parsed paragraphs are detached from the body, so 8x the pages is not 8x the memory
+    assert long < 2 * short
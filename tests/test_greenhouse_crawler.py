@@ -0,0 +1,74 @@
+import asyncio
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("fire")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from greenhouse_crawler import JobStore, crawl_boards
+from stub_servers import FIXTURES_DIR, GreenhouseStubHandler, serve
+
+
+class FeedsHandler(GreenhouseStubHandler):
+    """The recorded feeds, plus a board that answers with an HTML error page."""
+
+    latency_s = 0
+
+    def do_GET(self):
+        if "/boards/broken/" in self.path:
+            body = b"<html>502 Bad Gateway</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            return self.wfile.write(body)
+        return super().do_GET()
+
+
+def board(token: str) -> dict:
+    return {"company": token.title(), "board_url": f"https://boards.greenhouse.io/{token}"}
+
+
+@pytest.fixture
+def feeds(tmp_path, monkeypatch):
+    fixtures = tmp_path / "feeds"
+    shutil.copytree(FIXTURES_DIR / "greenhouse", fixtures)
+    # a job without a link and one with a null title are skipped or kept, not fatal
+    feed = json.loads((fixtures / "globexrobotics.json").read_text())
+    feed["jobs"].append({"id": "no-link", "title": "Ghost"})
+    feed["jobs"].append({**feed["jobs"][0], "id": "untitled", "title": None,
+                         "absolute_url": feed["jobs"][0]["absolute_url"] + "?untitled"})
+    (fixtures / "globexrobotics.json").write_text(json.dumps(feed))
+    monkeypatch.setattr(FeedsHandler, "fixtures_dir", fixtures)
+    return fixtures
+
+
+def crawl(base_url: str, store: JobStore) -> dict:
+    boards = [board("acmeanalytics"), board("broken"), board("globexrobotics")]
+    return asyncio.run(crawl_boards(boards, store, api_base=base_url))
+
+
+def test_malformed_board_does_not_stop_the_crawl(feeds, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    recorded = len(json.loads((FIXTURES_DIR / "greenhouse" / "globexrobotics.json").read_text())["jobs"])
+
+    with serve(FeedsHandler) as base_url:
+        first = crawl(base_url, store)
+        second = crawl(base_url, store)
+
+    assert first["broken"] == {"status": "error", "jobs": 0}
+    assert first["acmeanalytics"]["status"] == "updated"
+    assert first["globexrobotics"] == {"status": "updated", "jobs": recorded + 1}
+    assert "" in {job.title for job in store.jobs("globexrobotics")}
+
+    # unchanged feeds are answered with a 304 and keep their stored jobs
+    assert second["acmeanalytics"] == {"status": "unchanged", "jobs": 0}
+    assert second["globexrobotics"] == {"status": "unchanged", "jobs": 0}
+    assert second["broken"]["status"] == "error"
+    assert len(store.jobs("acmeanalytics")) == first["acmeanalytics"]["jobs"]
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from json_grammar import JsonStateMachine, compile_schema
+
+STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+
+def accepts(text: str, schema: dict = STRING_LIST) -> bool:
+    machine = JsonStateMachine(compile_schema(schema))
+    state = machine.advance(machine.initial(), text)
+    return state is not None and machine.is_complete(state)
+
+
+@pytest.mark.parametrize("text", [r'["\u00e9"]', r'["\uABcd and \n"]', r'["caf\u00E9\/"]'])
+def test_valid_escapes_are_accepted(text):
+    assert accepts(text)
+    json.loads(text)
+
+
+@pytest.mark.parametrize("text", [r'["\uzzzz"]', r'["\u12"]', r'["\u12g4"]', r'["\x41"]'])
+def test_invalid_escapes_are_rejected(text):
+    assert not accepts(text)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
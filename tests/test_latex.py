@@ -0,0 +1,21 @@
+import latex
+
+
+def test_failed_format_build_is_not_retried(monkeypatch, tmp_path):
+    builds = []
+
+    def failing_build(cmd, cwd, env, timeout, memory_limit_mb):
+        builds.append(cmd)
+        return True  # pdflatex ran, but no .fmt was written
+
+    monkeypatch.setattr(latex, "_run_pdflatex", failing_build)
+    monkeypatch.setattr(latex, "_failed_formats", set())
+    preamble = "\\documentclass{article}\n"
+
+    assert latex.ensure_format(preamble, str(tmp_path)) is None
+    assert latex.ensure_format(preamble, str(tmp_path)) is None
+    assert len(builds) == 1
+
+    # a different preamble still gets its own attempt
+    assert latex.ensure_format(preamble + "\\usepackage{hyperref}\n", str(tmp_path)) is None
+    assert len(builds) == 2
@@ -0,0 +1,47 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+import llm_client
+
+
+def refused(url, **kwargs):
+    raise httpx.ConnectError("connection refused")
+
+
+@pytest.fixture
+def worker_down(monkeypatch):
+    monkeypatch.setattr(llm_client.httpx, "post", refused)
+    monkeypatch.setattr(llm_client, "worker_available", lambda url: False)
+    # stands in for llm.py so the fallback does not load a model
+    monkeypatch.setitem(sys.modules, "llm", SimpleNamespace(extract_job_titles=lambda cv_text: ["Local Engineer"]))
+
+
+def test_missing_worker_raises_without_fallback(worker_down, monkeypatch):
+    monkeypatch.setattr(llm_client, "LOCAL_FALLBACK", False)
+
+    with pytest.raises(llm_client.WorkerUnavailableError, match="LLM_LOCAL_FALLBACK"):
+        llm_client.extract_job_titles("cv")
+
+
+def test_fallback_loads_the_model_locally_with_a_warning(worker_down, monkeypatch, capsys):
+    monkeypatch.setattr(llm_client, "LOCAL_FALLBACK", True)
+
+    assert llm_client.extract_job_titles("cv") == ["Local Engineer"]
+    assert "WARNING: LLM worker not reachable" in capsys.readouterr().out
+
+
+def test_health_is_not_checked_while_the_worker_answers(monkeypatch):
+    def answer(url, **kwargs):
+        return httpx.Response(200, json={"titles": ["Engineer"]}, request=httpx.Request("POST", url))
+
+    def health(url, **kwargs):
+        raise AssertionError("health checked before a request failed")
+
+    monkeypatch.setattr(llm_client.httpx, "post", answer)
+    monkeypatch.setattr(llm_client.httpx, "get", health)
+
+    assert llm_client.extract_job_titles("cv") == ["Engineer"]
@@ -0,0 +1,75 @@
+"""
+Prefix-cached generation must feed the model the same tokens as the plain path,
+even when the prompt is split inside a multi-character token.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import prefix_cache
+
+
+class MergingTokenizer:
+    """One token per character, except "\\n\\n", which is a single token as in BPE vocabularies."""
+
+    pad_token_id = 0
+
+    def __call__(self, text, add_special_tokens=True, return_tensors=None):
+        ids, i = [], 0
+        while i < len(text):
+            if text.startswith("\n\n", i):
+                ids.append(1)
+                i += 2
+            else:
+                ids.append(ord(text[i]))
+                i += 1
+        return SimpleNamespace(input_ids=torch.tensor([ids]) if return_tensors == "pt" else ids)
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(i) for i in ids)
+
+
+class RecordingModel:
+    device = "cpu"
+
+    def __init__(self):
+        self.prefilled = []
+        self.generated = []
+
+    def __call__(self, input_ids, past_key_values=None, use_cache=True):
+        self.prefilled.append(input_ids[0].tolist())
+
+    def generate(self, input_ids, **kwargs):
+        self.generated.append(input_ids[0].tolist())
+        return torch.cat([input_ids, torch.tensor([[ord("!")]])], dim=-1)
+
+
+@pytest.fixture
+def pipe(monkeypatch):
+    pipe = SimpleNamespace(tokenizer=MergingTokenizer(), model=RecordingModel())
+    monkeypatch.setattr(prefix_cache, "get_pipeline", lambda: pipe)
+    monkeypatch.setattr(prefix_cache, "_prefixes", type(prefix_cache._prefixes)())
+    return pipe
+
+
+def test_split_inside_a_merged_token_matches_the_full_prompt(pipe):
+    prefix, suffix = "CV text\n", "\nJob title: Engineer"
+    full_ids = pipe.tokenizer(prefix + suffix).input_ids
+
+    assert prefix_cache.generate_with_prefix(prefix, suffix) == "!"
+
+    assert pipe.model.generated == [full_ids]
+    # the trailing "\n" of the prefix is not a token of the full prompt, so it is not cached
+    assert pipe.model.prefilled == [full_ids[:len("CV text")]]
+
+
+def test_prefix_cache_is_reused_for_a_new_suffix(pipe):
+    prefix_cache.generate_with_prefix("CV text ", "Job A")
+    prefix_cache.generate_with_prefix("CV text ", "Job B")
+
+    assert len(pipe.model.prefilled) == 1
+    assert pipe.model.generated[1] == pipe.tokenizer("CV text Job B").input_ids
@@ -0,0 +1,98 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fire")
+
+# the local CSE stub lives with the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import tools
+from stub_servers import CSEStubHandler, StubHandler, serve
+
+DESCRIPTION = "software engineer intern or graduate in London, python and data science"
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("GOOGLE_CSE_API_KEY", "stub-key")
+    monkeypatch.setenv("GOOGLE_CSE_ENGINE_ID", "stub-engine")
+
+
+def test_sync_search_fetches_every_page_concurrently(credentials, monkeypatch):
+    monkeypatch.setattr(CSEStubHandler, "latency_s", 0)
+    monkeypatch.setattr(CSEStubHandler, "rate_limit_every", 2)
+    monkeypatch.setattr(CSEStubHandler, "request_count", 0)
+    with serve(CSEStubHandler) as base_url:
+        monkeypatch.setattr(tools, "GOOGLE_CSE_ENDPOINT", f"{base_url}/customsearch/v1")
+        urls = tools.search_jobs(DESCRIPTION, pages=2)
+
+    queries = tools._build_query_variants(tools._extract_keywords(DESCRIPTION))
+    # every page was fetched, including the ones retried after a 429
+    assert len(queries) > 1
+    assert CSEStubHandler.request_count > len(queries) * 2
+    assert urls and len(urls) == len(set(urls))
+    assert all("boards.greenhouse.io" in url for url in urls)
+
+
+class BrokenCSEHandler(StubHandler):
+    """Answers with an HTML error page, or a JSON list, instead of a CSE result object."""
+
+    def do_GET(self):
+        if self.path.endswith("start=1"):
+            body = b"<html>quota exceeded</html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path.endswith("start=11"):
+            self.send_json(200, ["not", "an", "object"])
+        else:
+            self.send_json(403, {"error": {"code": 403}})
+
+
+def test_malformed_responses_are_skipped(credentials, monkeypatch):
+    with serve(BrokenCSEHandler) as base_url:
+        monkeypatch.setattr(tools, "GOOGLE_CSE_ENDPOINT", f"{base_url}/customsearch/v1")
+        assert tools.search_jobs(DESCRIPTION, pages=3) == []
+
+
+class OddItemsHandler(StubHandler):
+    """CSE results whose items lack links, have null links or are not objects at all."""
+
+    def do_GET(self):
+        if self.path.endswith("start=1"):
+            items = [{"title": "no link"}, {"link": None}, "not an item",
+                     {"link": "https://boards.greenhouse.io/acme/jobs/1"}]
+            self.send_json(200, {"items": items})
+        else:
+            self.send_json(200, {"items": {"link": "not a list"}})
+
+
+def test_malformed_items_are_skipped(credentials, monkeypatch):
+    with serve(OddItemsHandler) as base_url:
+        monkeypatch.setattr(tools, "GOOGLE_CSE_ENDPOINT", f"{base_url}/customsearch/v1")
+        assert tools.search_jobs(DESCRIPTION, pages=2) == ["https://boards.greenhouse.io/acme/jobs/1"]
+
+
+def test_connection_errors_are_retried(credentials, monkeypatch):
+    attempts = []
+
+    def flaky(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            raise httpx.ConnectTimeout("timed out", request=request)
+        return httpx.Response(200, json={"items": [{"link": "https://boards.greenhouse.io/acme/jobs/1"}]})
+
+    monkeypatch.setattr(tools, "_retry_delay", lambda response, attempt: 0)
+
+    async def search():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(flaky)) as client:
+            return await tools.search_jobs_async("intern", pages=1, endpoint="https://cse.test", client=client)
+
+    assert asyncio.run(search()) == ["https://boards.greenhouse.io/acme/jobs/1"]
+    assert len(attempts) == 3
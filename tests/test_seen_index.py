@@ -0,0 +1,22 @@
+from seen_index import SeenIndex, normalize_link
+
+
+def test_query_that_identifies_the_listing_is_kept():
+    assert normalize_link("https://example.com/jobs?job=1") != normalize_link("https://example.com/jobs?job=2")
+
+
+def test_tracking_parameters_fragment_and_case_are_dropped():
+    assert normalize_link("HTTPS://Example.com/jobs/?utm_source=x&job=1&gh_src=abc#apply") == \
+        normalize_link("https://example.com/jobs?job=1")
+
+
+def test_parameter_order_does_not_matter():
+    assert normalize_link("https://example.com/j?a=1&b=2") == normalize_link("https://example.com/j?b=2&a=1")
+
+
+def test_marking_one_posting_does_not_mark_another(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite"))
+    index.mark({"title": "Engineer", "company": "Acme", "link": "https://example.com/jobs?job=1"}, "applied")
+
+    assert index.is_processed("https://example.com/jobs?job=1&utm_medium=email")
+    assert not index.is_processed("https://example.com/jobs?job=2")
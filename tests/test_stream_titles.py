@@ -0,0 +1,82 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm
+import llm_cache
+
+REPLY = ['["Data', ' Engineer",', ' "Analyst"', ']', " trailing text"]
+
+
+class FakeLlama:
+    def __init__(self, fail_after: int | None = None):
+        self.fail_after = fail_after
+        self.yielded = 0
+
+    def create_chat_completion(self, messages, stream=True, **kwargs):
+        for i, text in enumerate(REPLY):
+            if i == self.fail_after:
+                raise RuntimeError("llama.cpp decode failed")
+            self.yielded += 1
+            yield {"choices": [{"delta": {"content": text}}]}
+
+
+@pytest.fixture
+def llamacpp(monkeypatch):
+    monkeypatch.setattr(llm.model_provider, "BACKEND", "llamacpp")
+    monkeypatch.setattr(llm_cache.get_cache(), "enabled", False)
+
+
+def wait_until(condition, timeout_s: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_llamacpp_lock_is_free_while_the_caller_holds_a_title(llamacpp, monkeypatch):
+    monkeypatch.setattr(llm, "get_llama", lambda: FakeLlama())
+    titles = llm.stream_job_titles("cv")
+
+    assert next(titles) == "Data Engineer"
+    # decoding finished in the background, so other llama.cpp calls are not blocked
+    assert wait_until(lambda: not llm._llamacpp_lock.locked())
+    assert list(titles) == ["Analyst"]
+
+
+def test_llamacpp_errors_reach_the_caller(llamacpp, monkeypatch):
+    monkeypatch.setattr(llm, "get_llama", lambda: FakeLlama(fail_after=2))
+
+    with pytest.raises(RuntimeError, match="decode failed"):
+        list(llm.stream_job_titles("cv"))
+    assert not llm._llamacpp_lock.locked()
+
+
+def test_transformers_errors_end_the_stream(monkeypatch):
+    pytest.importorskip("transformers")
+
+    def failing_pipe(messages, **kwargs):
+        raise RuntimeError("CUDA out of memory")
+
+    failing_pipe.tokenizer = SimpleNamespace(decode=lambda ids, **kwargs: "")
+    monkeypatch.setattr(llm, "get_pipeline", lambda: failing_pipe)
+    monkeypatch.setattr(llm, "CONSTRAINED_DECODING", False)
+
+    outcome = []
+
+    def consume():
+        try:
+            list(llm._transformers_stream([], {}, list[str]))
+        except RuntimeError as e:
+            outcome.append(e)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    consumer.join(timeout=10)
+
+    assert not consumer.is_alive(), "stream blocked after the generation thread failed"
+    assert "out of memory" in str(outcome[0])
@@ -2,102 +2,139 @@
 Utility tools for the agentic internship auto-applier.
 """
 
+import asyncio
+import json
 import os
+import random
 import re
 import sys
 from typing import Optional
 import httpx
 
-# Google Custom Search API endpoint
-GOOGLE_CSE_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+# Google Custom Search API endpoint (overridable to point at a local stub server)
+GOOGLE_CSE_ENDPOINT = os.getenv("GOOGLE_CSE_ENDPOINT", "https://www.googleapis.com/customsearch/v1")
 
+# Google CSE returns at most 10 results per request
+CSE_PAGE_SIZE = 10
+MAX_CONCURRENT_REQUESTS = 4
+MAX_RETRIES = 4
 
-def search_jobs(rough_job_description: str) -> list[str]:
+
+def search_jobs(
+    rough_job_description: str,
+    pages: int = 3,
+    concurrency: int = MAX_CONCURRENT_REQUESTS,
+) -> list[str]:
     """
     Search for relevant job postings on Greenhouse given a rough job description.
 
     Extracts key terms from the description and searches Greenhouse job boards
-    using Google Custom Search Engine to find matching postings.
+    using Google Custom Search Engine to find matching postings. Runs
+    search_jobs_async on a fresh event loop, so it must not be called from async code.
 
     Args:
         rough_job_description: A natural language description of the job role
                              (e.g., "Looking for a software engineer intern in London")
+        pages: Number of CSE result pages (10 results each) to fetch per query variant
+        concurrency: Maximum number of requests in flight
 
     Returns:
         A list of URLs to matching Greenhouse job postings
     """
-    # Validate API credentials
-    api_key = os.getenv("GOOGLE_CSE_API_KEY")
-    search_engine_id = os.getenv("GOOGLE_CSE_ENGINE_ID")
-
-    print("api_key", api_key)
-    print("search engine id", search_engine_id)
-
-    if not api_key or not search_engine_id:
-        raise ValueError(
-            "Google CSE credentials not configured. "
-            "Set GOOGLE_CSE_API_KEY and GOOGLE_CSE_ENGINE_ID environment variables."
-        )
-
-    # Extract keywords from the description
-    keywords = _extract_keywords(rough_job_description)
-
-    # Build search query for Greenhouse
-    search_query = _build_greenhouse_search_query(keywords)
-
-    # Search for jobs using Google Custom Search
-    job_urls = _search_greenhouse_jobs(search_query, api_key, search_engine_id)
-
-    return job_urls
-
-
-def _extract_keywords(description: str) -> dict:
-    """
-    Extract relevant keywords from a rough job description.
+    return asyncio.run(search_jobs_async(
+        rough_job_description, pages=pages, concurrency=concurrency, endpoint=GOOGLE_CSE_ENDPOINT
+    ))
 
-    Returns:
-        A dict with 'titles', 'skills', 'levels', and 'locations'
-    """
-    description_lower = description.lower()
 
+DEFAULT_VOCABULARY = {
     # Common job titles for early-career roles
-    job_titles = [
+    'titles': [
         'intern', 'interns', 'internship',
         'graduate', 'graduate program',
         'entry', 'junior',
         'apprentice', 'spring week'
-    ]
-
-    # Extract mentioned job levels
-    found_titles = [title for title in job_titles if title in description_lower]
-
+    ],
     # Common tech skills
-    tech_skills = [
+    'skills': [
         'python', 'javascript', 'java', 'c++', 'rust', 'go',
         'react', 'vue', 'angular', 'node', 'nodejs',
         'machine learning', 'ml', 'data science', 'data',
         'backend', 'frontend', 'full stack', 'fullstack',
         'devops', 'cloud', 'aws', 'gcp', 'azure',
         'sql', 'database', 'api',
-    ]
+    ],
+    'locations': [
+        'london', 'uk', 'united kingdom', 'us', 'usa',
+        'san francisco', 'new york', 'remote', 'hybrid'
+    ],
+}
 
-    found_skills = [skill for skill in tech_skills if skill in description_lower]
 
-    # Extract potential locations (simple heuristic)
-    locations = []
-    location_patterns = [
-        r'\b(london|uk|united kingdom|us|usa|san francisco|new york|remote|hybrid)\b'
-    ]
-    for pattern in location_patterns:
-        matches = re.findall(pattern, description_lower)
-        locations.extend(matches)
+def load_vocabulary(path: str) -> dict:
+    """
+    Load a keyword vocabulary from a JSON file.
+
+    Expected format: {"titles": [...], "skills": [...], "locations": [...]}.
+    Categories missing from the file fall back to DEFAULT_VOCABULARY.
+    """
+    with open(path, 'r') as f:
+        vocabulary = json.load(f)
+    return {category: vocabulary.get(category, terms) for category, terms in DEFAULT_VOCABULARY.items()}
+
+
+class KeywordMatcher:
+    """
+    Matches a whole vocabulary in one pass with a single precompiled regex.
+
+    Terms only match as whole words ('go' does not match "good", 'ml' does not
+    match "html"), and longer terms win over their prefixes ("data science"
+    over "data").
+    """
 
-    return {
-        'titles': list(set(found_titles)) or ['internship'],
-        'skills': list(set(found_skills)) or ['software'],
-        'locations': list(set(locations)) or [],
-        'raw': description
-    }
+    def __init__(self, vocabulary: dict):
+        self.categories = {}
+        for category, terms in vocabulary.items():
+            for term in terms:
+                self.categories.setdefault(term.lower(), category)
+
+        alternation = '|'.join(re.escape(term) for term in sorted(self.categories, key=len, reverse=True))
+        self.pattern = re.compile(rf'(?<!\w)(?:{alternation})(?!\w)')
+
+    def extract(self, description: str) -> dict:
+        found = {category: {} for category in DEFAULT_VOCABULARY}
+        for match in self.pattern.finditer(description.lower()):
+            term = match.group(0)
+            found.setdefault(self.categories[term], {})[term] = None
+
+        return {
+            'titles': list(found['titles']) or ['internship'],
+            'skills': list(found['skills']) or ['software'],
+            'locations': list(found['locations']),
+            'raw': description
+        }
+
+    def extract_batch(self, descriptions: list[str]) -> list[dict]:
+        return [self.extract(description) for description in descriptions]
+
+
+_keyword_matcher = KeywordMatcher(
+    load_vocabulary(os.environ['KEYWORDS_VOCAB_PATH']) if os.getenv('KEYWORDS_VOCAB_PATH') else DEFAULT_VOCABULARY
+)
+
+
+def _extract_keywords(description: str) -> dict:
+    """
+    Extract relevant keywords from a rough job description.
+
+    Returns:
+        A dict with 'titles', 'skills', 'locations' and the raw description
+    """
+    return _keyword_matcher.extract(description)
+
+
+def extract_keywords_batch(descriptions: list[str]) -> list[dict]:
+    """Extract keywords from many descriptions with the shared compiled matcher."""
+    return _keyword_matcher.extract_batch(descriptions)
 
 
 def _build_greenhouse_search_query(keywords: dict) -> str:
@@ -111,7 +148,8 @@ def _build_greenhouse_search_query(keywords: dict) -> str:
 
     location_part = ''
     if keywords['locations']:
-        location_part = f" ({' OR '.join(f'"{loc}"' for loc in keywords['locations'][:2])})"
+        locations = ' OR '.join(f'"{loc}"' for loc in keywords['locations'][:2])
+        location_part = f" ({locations})"
 
     # Build Google site search query
     query = f"site:boards.greenhouse.io ({title_part}) ({skill_part}){location_part}"
@@ -119,52 +157,123 @@ def _build_greenhouse_search_query(keywords: dict) -> str:
     return query
 
 
-def _search_greenhouse_jobs(query: str, api_key: str, search_engine_id: str) -> list[str]:
+async def search_jobs_async(
+    rough_job_description: str,
+    pages: int = 3,
+    concurrency: int = MAX_CONCURRENT_REQUESTS,
+    endpoint: str = GOOGLE_CSE_ENDPOINT,
+    client: Optional[httpx.AsyncClient] = None,
+) -> list[str]:
     """
-    Search for jobs matching the query using Google Custom Search Engine.
+    Concurrent version of search_jobs that fetches several result pages for several query variants.
+
+    All requests share one pooled, keep-alive httpx.AsyncClient and at most
+    `concurrency` are in flight at once. Rate-limited (429) and 5xx responses are
+    retried with exponential backoff, honouring Retry-After.
 
     Args:
-        query: A search query string with keywords and filters
-        api_key: Google Custom Search API key
-        search_engine_id: Google Custom Search Engine ID
+        rough_job_description: A natural language description of the job role
+        pages: Number of CSE result pages (10 results each) to fetch per query variant
+        concurrency: Maximum number of requests in flight
+        endpoint: Custom Search endpoint, e.g. a local stub server for testing
+        client: Optional shared client; one is created and closed if not given
 
     Returns:
-        List of job posting URLs from Greenhouse
+        A de-duplicated list of Greenhouse job posting URLs, in result order
     """
-    job_urls = []
-
-    try:
-        # Make request to Google Custom Search API
-        with httpx.Client() as client:
-            response = client.get(
-                GOOGLE_CSE_ENDPOINT,
-                params={
-                    "q": query,
-                    "cx": search_engine_id,
-                    "key": api_key,
-                    "num": 10,  # Return up to 10 results
-                },
-                timeout=10.0,
-            )
-            response.raise_for_status()
-
-        results = response.json()
-
-        # Extract job URLs from search results
-        if "items" in results:
-            for item in results["items"]:
-                url = item.get("link")
-                if url and "boards.greenhouse.io" in url:
-                    job_urls.append(url)
-
-    except httpx.HTTPError as e:
-        print(f"HTTP error searching Greenhouse jobs: {e}")
-    except Exception as e:
-        print(f"Error searching Greenhouse jobs: {e}")
-
-    return job_urls
-
+    api_key = os.getenv("GOOGLE_CSE_API_KEY")
+    search_engine_id = os.getenv("GOOGLE_CSE_ENGINE_ID")
+    if not api_key or not search_engine_id:
+        raise ValueError(
+            "Google CSE credentials not configured. "
+            "Set GOOGLE_CSE_API_KEY and GOOGLE_CSE_ENGINE_ID environment variables."
+        )
 
+    keywords = _extract_keywords(rough_job_description)
+    queries = _build_query_variants(keywords)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_all(http: httpx.AsyncClient) -> list[list[str]]:
+        return await asyncio.gather(*(
+            _fetch_cse_page(http, semaphore, endpoint, query, 1 + page * CSE_PAGE_SIZE, api_key, search_engine_id)
+            for query in queries
+            for page in range(pages)
+        ))
+
+    if client is None:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+            results = await fetch_all(client)
+    else:
+        results = await fetch_all(client)
+
+    return list(dict.fromkeys(url for page_urls in results for url in page_urls))
+
+
+def _build_query_variants(keywords: dict) -> list[str]:
+    """The combined query plus one narrower query per extracted title."""
+    queries = [_build_greenhouse_search_query(keywords)]
+    for title in keywords['titles'][:3]:
+        queries.append(_build_greenhouse_search_query({**keywords, 'titles': [title]}))
+    return list(dict.fromkeys(queries))
+
+
+async def _fetch_cse_page(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    endpoint: str,
+    query: str,
+    start: int,
+    api_key: str,
+    search_engine_id: str,
+) -> list[str]:
+    params = {"q": query, "cx": search_engine_id, "key": api_key, "num": CSE_PAGE_SIZE, "start": start}
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                response = await client.get(endpoint, params=params)
+        except httpx.HTTPError as e:
+            # timeouts and dropped connections are retried like 429 / 5xx
+            if attempt == MAX_RETRIES:
+                print(f"HTTP error searching Greenhouse jobs: {e}")
+                return []
+            await asyncio.sleep(_retry_delay(None, attempt))
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == MAX_RETRIES:
+                print(f"Giving up on '{query}' (start={start}) after {response.status_code}")
+                return []
+            await asyncio.sleep(_retry_delay(response, attempt))
+            continue
+
+        if not response.is_success:
+            print(f"HTTP error searching Greenhouse jobs: {response.status_code} for '{query}'")
+            return []
+
+        try:
+            results = response.json()
+        except ValueError:
+            results = None
+        if not isinstance(results, dict):
+            print(f"Unexpected non-JSON response searching Greenhouse jobs for '{query}'")
+            return []
+
+        items = results.get("items")
+        if not isinstance(items, list):
+            return []
+        links = (item.get("link") or "" for item in items if isinstance(item, dict))
+        return [link for link in links if isinstance(link, str) and "boards.greenhouse.io" in link]
+
+    return []
+
+
+def _retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return (2 ** attempt) * 0.5 + random.uniform(0, 0.5)
 
 
 def load_target_boards(csv_path: str = "seeds/targets.csv") -> list[dict]: